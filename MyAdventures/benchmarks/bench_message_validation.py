@@ -0,0 +1,46 @@
+"""
+    Validations per second for message_schema.
+
+    Run from MyAdventures/:  python -m benchmarks.bench_message_validation
+"""
+import timeit
+from datetime import datetime
+from jsonschema import FormatChecker, validate
+from src.communication.message import message_schema, schema_validator, fast_check, validate_message
+
+MESSAGE = {
+    "type": "start",
+    "source": "User",
+    "target": "miner",
+    "timestamp": datetime.now().isoformat(),
+    "payload": {"x": 0, "y": 64, "z": 0},
+    "context": []
+}
+
+
+def per_call_validate():
+    # What validate_message did before: fresh FormatChecker, schema re-checked
+    validate(instance=MESSAGE, schema=message_schema, format_checker=FormatChecker())
+
+
+CASES = [
+    ("jsonschema.validate per call", per_call_validate),
+    ("cached validator", lambda: schema_validator.is_valid(MESSAGE)),
+    ("fast_check", lambda: fast_check(MESSAGE)),
+    ("validate_message (chat input)", lambda: validate_message(MESSAGE)),
+    ("validate_message (trusted)", lambda: validate_message(MESSAGE, trusted=True)),
+]
+
+
+def main(seconds=1.0):
+    baseline = None
+    for name, fn in CASES:
+        number, elapsed = timeit.Timer(fn).autorange()
+        runs = max(number, int(number * seconds / elapsed))
+        rate = runs / timeit.Timer(fn).timeit(runs)
+        baseline = baseline or rate
+        print(f"{name:<32} {rate:>12,.0f} /s  {rate / baseline:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
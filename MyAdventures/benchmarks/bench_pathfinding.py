@@ -0,0 +1,69 @@
+"""
+    Path searches per second with jump point search on and off, over a
+    synthetic 128 x 128 world: open ground, and the same ground with walls.
+    Bitmaps are built before timing and the path cache is bypassed.
+
+    Run from MyAdventures/:  python -m benchmarks.bench_pathfinding
+"""
+import timeit
+import numpy as np
+from src.world.pathfinding import PathFinder
+from src.world.world_model import WorldModel
+
+SIZE = 128
+START, GOAL = (5, 10, 5), (120, 10, 120)
+
+
+def open_ground():
+    blocks = np.zeros((32, SIZE, SIZE), np.uint16)
+    blocks[:10] = 1
+    return blocks
+
+
+def walls():
+    blocks = open_ground()
+    # Two-high walls along x with a gap at alternating ends
+    for i, z in enumerate(range(16, SIZE - 8, 16)):
+        gap = slice(0, 8) if i % 2 else slice(SIZE - 8, SIZE)
+        blocks[10:12, :, z] = 1
+        blocks[10:12, gap, z] = 0
+    return blocks
+
+
+def make_world(blocks):
+    world = WorldModel.__new__(WorldModel)
+    world.__init__()
+    world.ingest_many([
+        (cx * 16, 0, cz * 16, cx * 16 + 15, len(blocks) - 1, cz * 16 + 15, blocks[:, cx * 16:cx * 16 + 16, cz * 16:cz * 16 + 16])
+        for cx in range(SIZE // 16) for cz in range(SIZE // 16)
+    ])
+    return world
+
+
+def finder(world, jump):
+    pathfinder = PathFinder(world, jump_points=jump)
+    pathfinder.find_path(START, GOAL)
+
+    def search():
+        pathfinder._cache.clear()
+        return pathfinder.find_path(START, GOAL)
+    return pathfinder, search
+
+
+def main(seconds=1.0):
+    for name, blocks in (("open ground", open_ground()), ("walls", walls())):
+        world = make_world(blocks)
+        for label, jump in (("A*", False), ("A* + JPS", True)):
+            pathfinder, search = finder(world, jump)
+            number, elapsed = timeit.Timer(search).autorange()
+            runs = max(number, int(number * seconds / elapsed))
+            per_search = timeit.Timer(search).timeit(runs) / runs
+            print(
+                f"{name:<12} {label:<9} {per_search * 1000:>8.2f} ms/search  path {len(search()):>4}  "
+                f"expanded {pathfinder.expansions:>5}  "
+                f"bitmaps {pathfinder.walkability.memory_bytes() / 1024:>6.1f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
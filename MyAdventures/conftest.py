@@ -0,0 +1 @@
+# Lets pytest import the src.* packages when run from MyAdventures/
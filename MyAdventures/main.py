@@ -1,25 +1,20 @@
-import pkgutil
-import importlib
-import src.agents
-from src.agents.base_agent import BaseAgent
+import asyncio
+import os
+from src.utils.dynamic_discovery import discover_agents, format_import_profile
+from src.game_loop import game_loop
+from src.world.anvil import DIMENSIONS
 
-
-def discover_agents():
-    # Import all modules in agents package
-    for _, module_name, _ in pkgutil.iter_modules(src.agents.__path__):
-        importlib.import_module(f"{src.agents.__name__}.{module_name}")
-
-    # Collect subclasses
-    agents_list = []
-    for cls in BaseAgent.__subclasses__():
-        agents_list.append(cls)
-
-    return agents_list
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Server")
 
 if __name__ == "__main__":
+    # Every agent runs in this process, so all of them are imported here;
+    # the manifest only spares imports for callers that need a subset
     agents = discover_agents()
 
     print("Discovered agents:")
     for agent_cls in agents:
-        agent = agent_cls()
-        print(f"- {agent.__class__.__name__}")
+        print(f"- {agent_cls.__name__}")
+    print(format_import_profile())
+
+    region_dir = os.path.join(SERVER_DIR, DIMENSIONS["overworld"])
+    asyncio.run(game_loop(agents, region_dir=region_dir if os.path.isdir(region_dir) else None))
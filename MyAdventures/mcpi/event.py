@@ -2,6 +2,7 @@ from .vec3 import Vec3
 
 class BlockEvent:
     """An Event related to blocks (e.g. placed, removed, hit)"""
+    __slots__ = ("type", "pos", "face", "entityId")
     HIT = 0
 
     def __init__(self, type, x, y, z, face, entityId):
@@ -24,6 +25,7 @@ class BlockEvent:
 
 class ChatEvent:
     """An Event related to chat (e.g. posts)"""
+    __slots__ = ("type", "entityId", "message")
     POST = 0
 
     def __init__(self, type, entityId, message):
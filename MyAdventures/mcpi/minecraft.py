@@ -28,6 +28,18 @@ from .util import flatten
 def intFloor(*args):
     return [int(math.floor(x)) for x in flatten(args)]
 
+def _parseChatPosts(s, prefixes):
+    start = 0
+    end = len(s)
+    while start < end:
+        stop = s.find("|", start)
+        if stop == -1:
+            stop = end
+        comma = s.find(",", start, stop)
+        if comma != -1 and (prefixes is None or s.startswith(prefixes, comma + 1, stop)):
+            yield int(s[start:comma]), s[comma + 1:stop]
+        start = stop + 1
+
 class CmdPositioner:
     """Methods for setting and getting positions"""
     def __init__(self, connection, packagePrefix):
@@ -133,11 +145,17 @@ class CmdEvents:
         events = [e for e in s.split("|") if e]
         return [BlockEvent.Hit(*list(map(int, e.split(",")))) for e in events]
 
-    def pollChatPosts(self):
+    def pollChatPosts(self, prefixes=None):
         """Triggered by posts to chat => [ChatEvent]"""
+        return [ChatEvent.Post(entityId, message) for entityId, message in self.iterChatPosts(prefixes)]
+
+    def iterChatPosts(self, prefixes=None):
+        """Triggered by posts to chat => iterator of (entityId:int, message:str)
+
+        When prefixes (str or tuple of str) is given, only messages starting
+        with one of them are decoded; the rest are skipped in the raw reply."""
         s = self.conn.sendReceive(b"events.chat.posts")
-        events = [e for e in s.split("|") if e]
-        return [ChatEvent.Post(int(e[:e.find(",")]), e[e.find(",") + 1:]) for e in events]
+        return _parseChatPosts(s, prefixes)
 
 class Minecraft:
     """The main class to interact with a running instance of Minecraft Pi."""
@@ -1,14 +1,41 @@
 import asyncio
+import time
+import types
 from abc import ABC, abstractmethod
 from src.reflection.states import State
+from src.reflection.message_types import StatusCommand, PassiveCommand
+from src.utils.metrics import Metrics
 
 class BaseAgent(ABC):
     agent_name: str = None
+    # Seconds reserved for one perceive-decide-act cycle while RUNNING
+    tick_budget: float = 0.05
+    # Bound on pending commands; the broker applies its drop policy beyond it
+    queue_size: int = 100
+    # RateLimiter shared by every world round trip, assigned by the supervisor
+    io_limiter = None
+    # Callable that hands outgoing messages to the broker (or a process bridge)
+    outbox = None
 
     def __init__(self):
-        self.state = State.IDLE
-        self.message_queue = asyncio.Queue()
-    
+        self._state = State.IDLE
+        self._state_changed = asyncio.Event()
+        self.message_queue = asyncio.Queue(maxsize=self.queue_size)
+
+        self.cycles = 0
+        self.cpu_time = 0.0
+        self.metrics = Metrics()
+        self._metric_labels = (("agent", self.agent_name.value if self.agent_name else type(self).__name__),)
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, new_state):
+        self._state = new_state
+        self._state_changed.set()
+
     async def run(self):
         while True:
             match self.state:
@@ -18,31 +45,129 @@ class BaseAgent(ABC):
                     await self._execute_cycle()
                 case State.PAUSED:
                     await self._handle_paused()
+                case State.WAITING:
+                    await self._handle_waiting()
                 case State.STOPPED:
                     await self._handle_stopped()
                 case State.ERROR:
                     await self._handle_error()
 
     async def _execute_cycle(self):
-        perception = await self._perceive()
-        decision = await self._decide(perception)
-        await self._act(decision)
+        started = time.monotonic()
+        await self._charge_cpu(self._cycle())
+        self.cycles += 1
+
+        # Sleep out the rest of the tick, waking early for commands
+        remaining = self.tick_budget - (time.monotonic() - started)
+        await self._wait_for_wakeup(max(remaining, 0))
+
+    async def _cycle(self):
+        with self.metrics.timed("agent_perceive", self._metric_labels):
+            perception = await self._perceive()
+        with self.metrics.timed("agent_decide", self._metric_labels):
+            decision = await self._decide(perception)
+        with self.metrics.timed("agent_act", self._metric_labels):
+            await self._act(decision)
+        self.metrics.inc("agent_cycles", self._metric_labels)
+
+    @types.coroutine
+    def _charge_cpu(self, coro):
+        """
+            Await `coro`, adding to cpu_time only the thread time spent inside
+            it between suspensions, not what other tasks use while it waits.
+        """
+        step, value = coro.send, None
+        while True:
+            started = time.thread_time()
+            try:
+                future = step(value)
+            except StopIteration as done:
+                return done.value
+            finally:
+                self.cpu_time += time.thread_time() - started
+            try:
+                value, step = (yield future), coro.send
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as error:
+                value, step = error, coro.throw
+
+    async def _handle_idle(self):
+        await self._wait_for_wakeup()
+
+    async def _handle_paused(self):
+        await self._wait_for_wakeup()
+
+    async def _handle_waiting(self):
+        await self._wait_for_wakeup()
+
+    async def _handle_stopped(self):
+        await self._wait_for_wakeup()
 
-        try: 
-            cmd = self.message_queue.get_nowait()
-            self._process_command(cmd)
-        except asyncio.QueueEmpty:
-            pass
+    async def _handle_error(self):
+        await self._wait_for_wakeup()
+
+    async def _wait_for_wakeup(self, timeout=None):
+        """Suspend until a command arrives, the state changes or `timeout` expires."""
+        if self.message_queue.empty() and timeout != 0:
+            self._state_changed.clear()
+            getter = asyncio.ensure_future(self.message_queue.get())
+            changed = asyncio.ensure_future(self._state_changed.wait())
+            try:
+                await asyncio.wait((getter, changed), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                changed.cancel()
+                if getter.done() and not getter.cancelled():
+                    self._process_command(getter.result())
+                else:
+                    getter.cancel()
+        else:
+            await asyncio.sleep(0)
+
+        while not self.message_queue.empty():
+            self._process_command(self.message_queue.get_nowait())
+
+    async def _world_call(self, fn, *args):
+        """Run a MinecraftWorld call, waiting for the agent's I/O rate limit first."""
+        if self.io_limiter is not None:
+            await self.io_limiter.acquire()
+        return fn(*args)
+
+    def _send(self, message):
+        if self.outbox is not None:
+            self.outbox(message)
+
+    def _process_command(self, cmd):
+        match cmd.type:
+            case StatusCommand.PAUSE_AGENT:
+                if self.state == State.RUNNING:
+                    self.state = State.PAUSED
+            case StatusCommand.RESUME_AGENT:
+                if self.state == State.PAUSED:
+                    self.state = State.RUNNING
+                    self._on_resume()
+            case StatusCommand.STOP_AGENT:
+                self.state = State.STOPPED
+            case PassiveCommand.START_MAIN_ACTION:
+                self.state = State.RUNNING
+            case _:
+                self._handle_command(cmd)
+
+    def _handle_command(self, cmd):
+        pass
+
+    def _on_resume(self):
+        pass
 
     @abstractmethod
-    def _perceive (self):
-        return 
-    
+    async def _perceive (self):
+        return
+
     @abstractmethod
-    def _decide (self):
+    async def _decide (self, perception):
         pass
-    
+
     @abstractmethod
-    def _act (self):
+    async def _act (self, decision):
         pass
-    
@@ -1,15 +1,225 @@
-from .base_agent import BaseAgent 
+import json
+import os
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+import numpy as np
+from .base_agent import BaseAgent
 from ..command_related.agent_names import AgentNames
+from src.building.bom import BillOfMaterials, block_name
+from src.building.blueprint import diff_blueprint
+from src.building.plans import PLANS, compile_plan
+from src.command_related.message_builder import MessageBuilder
+from src.reflection.message_types import InnerCommand, PassiveCommand
+from src.reflection.states import State
+from src.utils.logging import Logger
+from src.utils.minecraft_world import MinecraftWorld
+from src.world.world_model import WorldModel
+
+
+@dataclass
+class BuildJob:
+    plan_name: str
+    origin: tuple
+    commands: deque
+    placed: int = 0
+    started: float = field(default_factory=time.monotonic)
+    # Re-read the site and rebuild `commands` from the differences first
+    needs_diff: bool = False
+
 
 class BuilderBot(BaseAgent):
-    agent_name = AgentNames.BUILDER 
+    agent_name = AgentNames.BUILDER
+    default_plan = "house"
+    # setBlocks commands sent per cycle
+    commands_per_cycle = 16
+    # Progress of the current build, so it can be resumed after a restart
+    checkpoint_path = "builder_checkpoint.json"
+
+    def __init__(self):
+        super().__init__()
+        self.logger = Logger()
+        self.mc = MinecraftWorld()
+        self.world = WorldModel()
+        self.plan_name = self.default_plan
+        self.site = None
+        self.job = None
+        self.bom = None
+        self.bom_requested = False
+        # Blocks handed over by the miner and not placed yet
+        self.supplied = Counter()
+        self._restore()
+
+    def _handle_command(self, cmd):
+        payload = cmd.payload or {}
+        match cmd.type:
+            case "set_plan" | PassiveCommand.SET_NEW_TEMPLATE:
+                self.plan_name = payload["plan_name"]
+                self.site = None
+                self._track(None)
+            case "plan_list":
+                self.mc.post_message_chat("builder plans: " + ", ".join(
+                    f"{name} {'x'.join(map(str, plan.size))}" for name, plan in PLANS.items()
+                ))
+            case "build":
+                if self.job is not None and self.job.plan_name == self.plan_name:
+                    # Same plan still pending (paused, stopped or restored): resume it
+                    self.job.needs_diff = True
+                    self.state = State.RUNNING
+                else:
+                    self.site = self.site or self.site_for(self.plan_name)
+                    self._start(self.site)
+            case "bom":
+                self.bom_requested = True
+                if self.state == State.IDLE:
+                    self.state = State.RUNNING
+            case PassiveCommand.FULFILL_BOM:
+                self.supplied.update({int(block_id): count for block_id, count in payload.get("fulfilled", {}).items()})
+                self.logger.log_info(self.agent_name.value, "bom", "supplied by %s: %s", cmd.source_name, payload)
+            case "status":
+                self.mc.post_message_chat(self.status_text())
+
+    def site_for(self, plan_name):
+        """Lowest corner to build at: the nearest surveyed flat spot, else beside the player."""
+        width, _, depth = PLANS[plan_name].size
+        position = self.mc.get_player_position()
+        site = self.world.flat_area(max(width, depth), near=(position.x, position.z))
+        return site or (position.x + 2, position.y, position.z + 2)
+
+    def _start(self, origin):
+        commands = compile_plan(self.plan_name, tuple(origin))
+        self.job = BuildJob(self.plan_name, tuple(origin), deque(commands))
+        self.state = State.RUNNING
+        self.logger.log_info(
+            self.agent_name.value, "build", "%s at %s: %d setBlocks for %d blocks",
+            self.plan_name, origin, len(commands), sum(c.blocks for c in commands)
+        )
+
+    def _on_resume(self):
+        if self.job is not None:
+            self.job.needs_diff = True
+
+    def _checkpoint(self):
+        job = self.job
+        if job is None:
+            if os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+            return
+        state = {"plan_name": job.plan_name, "origin": list(job.origin), "placed": job.placed, "commands_left": len(job.commands)}
+        # Write-then-rename so a crash never leaves half a checkpoint
+        with open(self.checkpoint_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(self.checkpoint_path + ".tmp", self.checkpoint_path)
+
+    def _restore(self):
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get("plan_name") not in PLANS:
+            return
+        self.plan_name = state["plan_name"]
+        self.site = tuple(state["origin"])
+        self.job = BuildJob(self.plan_name, self.site, deque(), state.get("placed", 0), needs_diff=True)
+        self.state = State.PAUSED
+        self.logger.log_info(
+            self.agent_name.value, "build", "unfinished %s at %s restored, paused until resumed",
+            self.plan_name, self.site
+        )
+
+    def _track(self, bom):
+        """Replace the tracked BOM, keeping it subscribed to world changes."""
+        if self.bom is not None:
+            self.world.listeners.remove(self.bom.apply)
+        self.bom = bom
+        if bom is not None:
+            self.world.listeners.append(bom.apply)
+
+    async def _read_site(self, blueprint, origin):
+        """The blueprint's footprint at origin as a (y, x, z) array, one getBlocks call."""
+        width, height, depth = blueprint.size
+        x, y, z = origin
+        ids = await self._world_call(self.mc.get_blocks, x, y, z, x + width - 1, y + height - 1, z + depth - 1)
+        return np.fromiter(ids, dtype=np.uint16).reshape(height, width, depth)
+
+    async def _perceive(self):
+        if self.job is not None and self.job.needs_diff:
+            job = self.job
+            return "resume", job.origin, await self._read_site(PLANS[job.plan_name], job.origin)
+        if self.bom_requested:
+            self.bom_requested = False
+            self.site = self.site or self.site_for(self.plan_name)
+            return "bom", self.site, await self._read_site(PLANS[self.plan_name], self.site)
+        return None
+
+    async def _decide(self, perception):
+        if perception is not None:
+            kind, origin, site = perception
+            plan_name = self.job.plan_name if kind == "resume" else self.plan_name
+            self._track(BillOfMaterials(plan_name, PLANS[plan_name], origin, site))
+            if kind == "bom":
+                self._share_bom()
+            else:
+                self._resume_from(site)
+        if self.job is None:
+            return []
+        commands = self.job.commands
+        return [commands.popleft() for _ in range(min(self.commands_per_cycle, len(commands)))]
+
+    async def _act(self, decision):
+        for command in decision:
+            await self._world_call(self.mc.set_blocks, *command.corners, command.block_id)
+            self.world.fill(*command.corners, command.block_id)
+            self.job.placed += command.blocks
+            self.supplied -= Counter({command.block_id: command.blocks})
+            self.metrics.inc("blocks_placed", self._metric_labels, command.blocks)
+        if self.job is not None and not self.job.commands and not self.job.needs_diff:
+            self._finish()
+        if decision:
+            self._checkpoint()
+        elif self.job is None and not self.bom_requested:
+            self.state = State.IDLE
+
+    def _resume_from(self, site):
+        """Replace the remaining commands with just what the site is missing."""
+        job = self.job
+        commands = diff_blueprint(PLANS[job.plan_name], job.origin, site)
+        full = compile_plan(job.plan_name, job.origin)
+        job.commands = deque(commands)
+        job.needs_diff = False
+        self.logger.log_info(
+            self.agent_name.value, "build", "resuming %s at %s: %d setBlocks for %d blocks (full plan %d for %d)",
+            job.plan_name, job.origin, len(commands), sum(c.blocks for c in commands),
+            len(full), sum(c.blocks for c in full)
+        )
 
-    def _perceive(self):
-        pass
+    def _share_bom(self):
+        """Post the BOM to chat and ask the miner for the materials not supplied yet."""
+        bom = self.bom
+        self.mc.post_message_chat("builder bom: " + bom.text())
+        materials = bom.materials(self.supplied)
+        if materials:
+            self._send(MessageBuilder.create_agent_to_agent_message(
+                self.agent_name.value, AgentNames.MINER.value, InnerCommand.BOM_REQUEST.value,
+                {"plan": bom.plan_name, "origin": list(bom.origin), "materials": materials}
+            ))
 
-    def _decide(self):
-        pass
+    def _finish(self):
+        job, self.job = self.job, None
+        self.logger.log_info(
+            self.agent_name.value, "build", "%s done: %d blocks in %.1fs",
+            job.plan_name, job.placed, time.monotonic() - job.started
+        )
+        self._checkpoint()
+        self.state = State.IDLE
 
-    def _act(self):
-        pass
-        
\ No newline at end of file
+    def status_text(self):
+        text = f"builder: idle, plan {self.plan_name}"
+        if self.job is not None:
+            text = f"builder: {self.job.plan_name} at {self.job.origin}, {self.job.placed} blocks placed, {len(self.job.commands)} commands left"
+        if self.bom is not None:
+            text += "; bom " + self.bom.text()
+        if self.supplied:
+            text += "; supplied " + ", ".join(f"{block_name(block_id)} {count}" for block_id, count in sorted(self.supplied.items()))
+        return text
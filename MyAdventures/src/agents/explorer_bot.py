@@ -1,14 +1,105 @@
-from .base_agent import BaseAgent 
+from collections import deque
+from .base_agent import BaseAgent
 from ..command_related.agent_names import AgentNames
+from src.command_related.message_builder import MessageBuilder
+from src.reflection.message_types import InnerCommand, PassiveCommand
+from src.reflection.states import State
+from src.utils.logging import Logger
+from src.utils.minecraft_world import MinecraftWorld
+from src.world.chunk_store import SECTION
+from src.world.ore_index import ORES
+from src.world.world_model import WorldModel
+
 
 class ExplorerBot(BaseAgent):
     agent_name = AgentNames.EXPLORER
-    
-    def _perceive(self):
-        pass
+    default_range = 32
+    # Survey height band, whole 16-block sections
+    y_min = 0
+    y_max = 127
+
+    def __init__(self):
+        super().__init__()
+        self.logger = Logger()
+        self.mc = MinecraftWorld()
+        self.world = WorldModel()
+        self.range = self.default_range
+        self.center = None
+        self.pending = deque()
+
+    def _handle_command(self, cmd):
+        payload = cmd.payload or {}
+        match cmd.type:
+            case "start":
+                self.range = payload.get("range", self.range)
+                self._plan(payload.get("x"), payload.get("z"))
+                self.state = State.RUNNING
+            case "set_range" | PassiveCommand.SET_NEW_RANGE:
+                self.range = payload["range"]
+            case "status":
+                self.mc.post_message_chat(self.status_text())
+
+    def _plan(self, x, z):
+        """Queue the chunk columns covering the range, nearest to the center first."""
+        if x is None or z is None:
+            position = self.mc.get_player_position()
+            x = position.x if x is None else x
+            z = position.z if z is None else z
+        self.center = (x, z)
+
+        chunks = [
+            (cx, cz)
+            for cx in range((x - self.range) >> 4, ((x + self.range) >> 4) + 1)
+            for cz in range((z - self.range) >> 4, ((z + self.range) >> 4) + 1)
+            if not self.world.is_surveyed(cx, cz)
+        ]
+        chunks.sort(key=lambda c: (c[0] * SECTION + 8 - x) ** 2 + (c[1] * SECTION + 8 - z) ** 2)
+        self.pending = deque(chunks)
+        self.logger.log_info(self.agent_name.value, "survey", "%d chunks to survey around %s (range %d)", len(chunks), self.center, self.range)
+
+    def _bounds(self, cx, cz):
+        x0, z0 = cx * SECTION, cz * SECTION
+        return x0, self.y_min, z0, x0 + SECTION - 1, self.y_max, z0 + SECTION - 1
+
+    async def _perceive(self):
+        if not self.pending:
+            return None
+        cx, cz = self.pending[0]
+        # One round trip for the whole chunk column
+        ids = await self._world_call(self.mc.get_blocks, *self._bounds(cx, cz))
+        return cx, cz, list(ids)
+
+    async def _decide(self, perception):
+        return perception
+
+    async def _act(self, decision):
+        if decision is None:
+            self._finish()
+            return
+        cx, cz, ids = decision
+        self.world.ingest(*self._bounds(cx, cz), ids)
+        self.pending.popleft()
+
+    def _finish(self):
+        summary = self.summary()
+        self.logger.log_info(self.agent_name.value, "survey", "survey finished: %s", summary)
+        self._send(MessageBuilder.create_broadcast_message(self.agent_name.value, InnerCommand.MAP_INFO.value, summary))
+        self.state = State.IDLE
 
-    def _decide(self):
-        pass
+    def summary(self):
+        x, z = self.center or (0, 0)
+        return {
+            "center": [x, z],
+            "range": self.range,
+            "chunks": len(self.world.chunks),
+            "ores": {name: self.world.ores.count(block_id) for name, block_id in ORES.items()},
+            "largest_flat_area": self.world.largest_flat_area(),
+            "memory_bytes": self.world.store.memory_bytes(),
+        }
 
-    def _act(self):
-        pass
\ No newline at end of file
+    def status_text(self):
+        if self.pending:
+            return f"explorer: surveying, {len(self.pending)} chunks left around {self.center}"
+        summary = self.summary()
+        ores = ", ".join(f"{name} {count}" for name, count in summary["ores"].items() if count)
+        return f"explorer: {summary['chunks']} chunks surveyed, flat area up to {summary['largest_flat_area']}, ores: {ores or 'none'}"
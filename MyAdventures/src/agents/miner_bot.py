@@ -1,14 +1,190 @@
-from .base_agent import BaseAgent 
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+import numpy as np
+from .base_agent import BaseAgent
 from ..command_related.agent_names import AgentNames
+from src.command_related.message_builder import MessageBuilder
+from src.reflection.message_types import InnerCommand, PassiveCommand
+from src.reflection.states import State
+from src.utils.dynamic_discovery import discover_strategies
+from src.utils.logging import Logger
+from src.utils.minecraft_world import MinecraftWorld
+from src.world.ore_index import ORES
+from src.world.pathfinding import PathFinder, walk
+from src.world.world_model import WorldModel
+
+
+@dataclass
+class MiningJob:
+    strategy: object
+    volume: tuple
+    site: tuple
+    walked: bool = False
+    cuboids: deque = None
+    collected: dict = field(default_factory=dict)
+    mined: int = 0
+    started: float = field(default_factory=time.monotonic)
+    finished: float = None
+
+    @property
+    def blocks_per_second(self):
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return self.mined / elapsed if elapsed > 0 else 0.0
+
 
 class MinerBot(BaseAgent):
     agent_name = AgentNames.MINER
-    
-    def _perceive(self):
-        pass
+    default_strategy = "vertical_mining"
+    # Radius searched for ores around the player
+    ore_radius = 64
+    # setBlocks cuboids sent per cycle
+    clears_per_cycle = 8
+    # Walk the player to the work site over surveyed terrain before digging
+    walk_to_site = True
+
+    def __init__(self):
+        super().__init__()
+        self.logger = Logger()
+        self.mc = MinecraftWorld()
+        self.world = WorldModel()
+        self.pathfinder = PathFinder(self.world)
+        self.strategies = discover_strategies()
+        self.strategy = self.strategies[self.default_strategy]()
+        self.job = None
+        self.last_job = None
+        # Blocks collected by finished jobs and not yet handed to the builder
+        self.inventory = Counter()
+
+    def _handle_command(self, cmd):
+        payload = cmd.payload or {}
+        match cmd.type:
+            case "set_strategy" | PassiveCommand.SET_NEW_STRATEGY:
+                self.strategy = self.strategies[payload["strategy"]]()
+            case "start":
+                self._start(payload.get("x"), payload.get("y"), payload.get("z"))
+            case InnerCommand.BOM_REQUEST:
+                self._fulfill(cmd)
+            case "status":
+                self.mc.post_message_chat(self.status_text())
+
+    def _fulfill(self, cmd):
+        """Hand over what the inventory covers of a builder's BOM and report the rest."""
+        fulfilled, missing = {}, {}
+        for block_id, count in cmd.payload["materials"].items():
+            given = min(self.inventory[int(block_id)], count)
+            self.inventory[int(block_id)] -= given
+            if given:
+                fulfilled[block_id] = given
+            if count > given:
+                missing[block_id] = count - given
+        self.inventory = +self.inventory
+        self._send(MessageBuilder.create_agent_to_agent_message(
+            self.agent_name.value, cmd.source_name, PassiveCommand.FULFILL_BOM.value,
+            {"plan": cmd.payload.get("plan"), "fulfilled": fulfilled, "missing": missing}
+        ))
+
+    def _start(self, x, y, z):
+        """
+            Mine at the given coordinates, else from the surface above the
+            nearest known ore, else under the player.
+        """
+        if x is None and y is None and z is None:
+            position = self.mc.get_player_position()
+            found = self.nearest_ore((position.x, position.y, position.z))
+            if found is None:
+                x, z = position.x, position.z
+            else:
+                # Only the column: strategies dig down from where they start
+                kind, ore = found
+                x, _, z = ore
+                self.logger.log_info(self.agent_name.value, "mining", "nearest known ore: %s at %s", kind, ore)
+        elif x is None or z is None:
+            position = self.mc.get_player_position()
+            x = position.x if x is None else x
+            z = position.z if z is None else z
+        if y is None:
+            y = self.mc.get_block_altitude(x, z)
+        self.job = MiningJob(self.strategy, self.strategy.volume(x, y, z), self.strategy.site(x, y, z))
+        self.state = State.RUNNING
+        self.logger.log_info(self.agent_name.value, "mining", "%s at %s", self.strategy.strategy_name, (x, y, z))
+
+    async def _perceive(self):
+        if self.job is None or self.job.cuboids is not None:
+            return None
+        if self.walk_to_site and not self.job.walked:
+            self.job.walked = True
+            await self._walk_to(self.job.site)
+        # The whole volume in one round trip
+        x0, y0, z0, x1, y1, z1 = self.job.volume
+        ids = await self._world_call(self.mc.get_blocks, *self.job.volume)
+        return np.fromiter(ids, dtype=np.uint16).reshape(y1 - y0 + 1, x1 - x0 + 1, z1 - z0 + 1)
+
+    async def _decide(self, perception):
+        job = self.job
+        if job is None:
+            return []
+        if perception is not None:
+            x0, y0, z0 = job.volume[:3]
+            cuboids, job.collected = job.strategy.plan(perception, (x0, y0, z0))
+            job.cuboids = deque(cuboids)
+        return [job.cuboids.popleft() for _ in range(min(self.clears_per_cycle, len(job.cuboids)))]
+
+    async def _act(self, decision):
+        for corners, cleared in decision:
+            await self._world_call(self.mc.set_blocks, *corners, 0)
+            self.world.fill(*corners, 0)
+            self.job.mined += cleared
+            self.metrics.inc("blocks_mined", self._metric_labels, cleared)
+        if self.job is not None and not self.job.cuboids:
+            self._finish()
+
+    def _finish(self):
+        job, self.job = self.job, None
+        job.finished = time.monotonic()
+        self.last_job = job
+        self.inventory.update(job.collected)
+        self.logger.log_info(
+            self.agent_name.value, "mining", "%s done: %d blocks, %.1f blocks/s",
+            job.strategy.strategy_name, job.mined, job.blocks_per_second
+        )
+        self._send(MessageBuilder.create_broadcast_message(
+            self.agent_name.value, InnerCommand.INVENTORY_UPDATE.value,
+            {"collected": {str(block_id): count for block_id, count in job.collected.items()}}
+        ))
+        self.state = State.IDLE
+
+    async def _walk_to(self, goal):
+        position = self.mc.get_player_position()
+        path = await self.pathfinder.find_path_async((position.x, position.y, position.z), goal)
+        if path is None:
+            self.logger.log_debug(self.agent_name.value, "walk", "no known path from %s to %s", position, goal)
+            return False
+        await walk(path, lambda x, y, z: self._world_call(self.mc.set_player_tile_position, x, y, z))
+        return True
+
+    def nearest_ore(self, position, kinds=ORES):
+        """(ore name, (x, y, z)) of the closest known ore of the given kinds, or None."""
+        found = self.world.ores.nearest_any(position, [ORES[kind] for kind in kinds], self.ore_radius)
+        if found is None:
+            return None
+        block_id, where = found
+        return next(name for name, ore_id in ORES.items() if ore_id == block_id), where
 
-    def _decide(self):
-        pass
+    def status_text(self):
+        job = self.job or self.last_job
+        if job is not None:
+            left = len(job.cuboids) if job.cuboids is not None else "?"
+            return (
+                f"miner: {job.strategy.strategy_name} {job.mined} blocks at {job.blocks_per_second:.1f} blocks/s"
+                + (f", {left} cuboids left" if self.job else ", done")
+            )
 
-    def _act(self):
-        pass
\ No newline at end of file
+        position = self.mc.get_player_position()
+        here = (position.x, position.y, position.z)
+        nearest = []
+        for kind, block_id in ORES.items():
+            where = self.world.ores.nearest(block_id, here, self.ore_radius)
+            if where is not None:
+                nearest.append(f"{kind} at {where}")
+        return "miner: " + (", ".join(nearest) if nearest else f"no known ores within {self.ore_radius} blocks")
@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+import numpy as np
+from src.world.boxes import merge_boxes, to_world
+
+"""
+    Blueprints and the compiler that turns them into setBlocks calls.
+
+    A blueprint is a palette (one character per block id) and its layers
+    from the bottom up, each layer being rows along z of characters along x.
+    Identical consecutive layers are written once with a repeat count. '.'
+    means air (the spot is cleared) and ' ' means leave whatever is there.
+"""
+
+AIR = 0
+# Cells the blueprint does not care about
+KEEP = 0xFFFF
+
+
+@dataclass(frozen=True)
+class Blueprint:
+    name: str
+    palette: tuple
+    # ((repeat, (row, row, ...)), ...) bottom layer first
+    layers: tuple
+
+    def to_array(self):
+        """Target block ids as a (y, x, z) uint16 array, KEEP where nothing is placed."""
+        lookup = dict(self.palette)
+        lookup.update({".": AIR, " ": KEEP})
+        stacked = []
+        for repeat, rows in self.layers:
+            width = max(len(row) for row in rows)
+            # rows run along z, characters along x
+            layer = [[lookup[row[x]] if x < len(row) else KEEP for row in rows] for x in range(width)]
+            stacked.extend([layer] * repeat)
+        return np.array(stacked, dtype=np.uint16)
+
+    @property
+    def size(self):
+        """(width along x, height, depth along z)."""
+        height, width, depth = self.to_array().shape
+        return width, height, depth
+
+
+@dataclass(frozen=True)
+class BuildCommand:
+    corners: tuple
+    block_id: int
+    blocks: int
+
+
+def _commands(target, origin, required, reusable=None):
+    commands = []
+    for block_id in np.unique(target[required]).tolist():
+        mask = required & (target == block_id)
+        allowed = reusable & (target == block_id) if reusable is not None else None
+        pending = mask.copy()
+        for box in merge_boxes(mask, allowed):
+            y0, x0, z0, y1, x1, z1 = box
+            region = pending[y0:y1 + 1, x0:x1 + 1, z0:z1 + 1]
+            commands.append(BuildCommand(to_world(box, origin), block_id, int(region.sum())))
+            region[...] = False
+
+    commands.sort(key=lambda c: (c.block_id != AIR, c.corners[1], c.block_id))
+    return tuple(commands)
+
+
+def compile_blueprint(blueprint, origin):
+    """
+        setBlocks commands reproducing `blueprint` with its lowest corner at
+        origin: air is cleared first, then solid blocks bottom-up so nothing
+        is placed before what it rests on, grouped by block type per level
+        and merged into boxes as large as the blueprint allows.
+    """
+    target = blueprint.to_array()
+    return _commands(target, origin, target != KEEP)
+
+
+def diff_blueprint(blueprint, origin, site):
+    """
+        Like compile_blueprint, but only for the cells where `site` (a bulk
+        read of the footprint at origin) differs from the blueprint. Boxes
+        may still spill over cells that already hold the right block.
+    """
+    target = blueprint.to_array()
+    site = np.asarray(site, dtype=np.uint16).reshape(target.shape)
+    correct = site == target
+    return _commands(target, origin, (target != KEEP) & ~correct, correct)
@@ -0,0 +1,75 @@
+from collections import Counter
+import numpy as np
+import mcpi.block as block
+from src.building.blueprint import AIR, KEEP
+
+"""
+    Bill of materials: the blocks a blueprint still needs at a given site.
+    Built once from a bulk read of the site, then kept current from the
+    setBlocks cuboids agents report instead of reading the site again.
+"""
+
+BLOCK_NAMES = {value.id: name.lower() for name, value in vars(block).items() if isinstance(value, block.Block)}
+
+
+def block_name(block_id):
+    return BLOCK_NAMES.get(block_id, str(block_id))
+
+
+class BillOfMaterials:
+
+    def __init__(self, plan_name, blueprint, origin, site):
+        """`site` is the (y, x, z) array read over the blueprint's footprint at origin."""
+        self.plan_name = plan_name
+        self.origin = tuple(origin)
+        self.target = blueprint.to_array()
+        self.current = np.array(site, dtype=np.uint16).reshape(self.target.shape)
+
+        wrong = (self.target != KEEP) & (self.current != self.target)
+        ids, counts = np.unique(self.target[wrong & (self.target != AIR)], return_counts=True)
+        self.needed = Counter(dict(zip(ids.tolist(), counts.tolist())))
+        self.to_clear = int((wrong & (self.target == AIR)).sum())
+
+    def apply(self, corners, block_id):
+        """Account for `block_id` being set over the world cuboid `corners`."""
+        x0, y0, z0, x1, y1, z1 = corners
+        ox, oy, oz = self.origin
+        height, width, depth = self.target.shape
+        # Cuboid clipped to the site, in site indices
+        ys = slice(max(min(y0, y1) - oy, 0), min(max(y0, y1) - oy + 1, height))
+        xs = slice(max(min(x0, x1) - ox, 0), min(max(x0, x1) - ox + 1, width))
+        zs = slice(max(min(z0, z1) - oz, 0), min(max(z0, z1) - oz + 1, depth))
+        if ys.start >= ys.stop or xs.start >= xs.stop or zs.start >= zs.stop:
+            return
+
+        target = self.target[ys, xs, zs]
+        current = self.current[ys, xs, zs]
+        care = target != KEEP
+        before = care & (current != target)
+        after = care & (target != block_id)
+        current[...] = block_id
+
+        solid = target != AIR
+        for mask, sign in ((before & ~after & solid, -1), (after & ~before & solid, 1)):
+            ids, counts = np.unique(target[mask], return_counts=True)
+            for needed_id, count in zip(ids.tolist(), counts.tolist()):
+                self.needed[needed_id] += sign * count
+        self.to_clear += int((after & ~before & ~solid).sum()) - int((before & ~after & ~solid).sum())
+        self.needed = +self.needed
+
+    @property
+    def complete(self):
+        return not self.needed and not self.to_clear
+
+    def materials(self, on_hand=None):
+        """{block id (str): count} still to place beyond `on_hand` (a Counter), JSON friendly."""
+        needed = self.needed - on_hand if on_hand else self.needed
+        return {str(block_id): count for block_id, count in sorted(needed.items())}
+
+    def text(self):
+        if self.complete:
+            return f"{self.plan_name} at {self.origin}: complete"
+        parts = [f"{block_name(block_id)} {count}" for block_id, count in sorted(self.needed.items())]
+        if self.to_clear:
+            parts.append(f"{self.to_clear} to clear")
+        return f"{self.plan_name} at {self.origin}: " + ", ".join(parts)
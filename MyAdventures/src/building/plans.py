@@ -0,0 +1,154 @@
+from functools import lru_cache
+import mcpi.block as block
+from src.building.blueprint import Blueprint, compile_blueprint
+
+"""
+    The plans BuilderBot knows, as layer blueprints (see blueprint.py).
+"""
+
+HOUSE = Blueprint(
+    name="house",
+    palette=(
+        ("C", block.COBBLESTONE.id),
+        ("P", block.WOOD_PLANKS.id),
+        ("W", block.WOOD.id),
+        ("G", block.GLASS.id),
+    ),
+    layers=(
+        (1, (
+            "CCCCCCC",
+            "CCCCCCC",
+            "CCCCCCC",
+            "CCCCCCC",
+            "CCCCCCC",
+        )),
+        (1, (
+            "WPPPPPW",
+            "P.....P",
+            "P.....P",
+            "P.....P",
+            "WPP.PPW",
+        )),
+        (1, (
+            "WPGGGPW",
+            "P.....P",
+            "G.....G",
+            "P.....P",
+            "WPP.PPW",
+        )),
+        (1, (
+            "WPPPPPW",
+            "P.....P",
+            "P.....P",
+            "P.....P",
+            "WPPPPPW",
+        )),
+        (1, (
+            "PPPPPPP",
+            "PPPPPPP",
+            "PPPPPPP",
+            "PPPPPPP",
+            "PPPPPPP",
+        )),
+    ),
+)
+
+TOWER = Blueprint(
+    name="tower",
+    palette=(
+        ("S", block.STONE_BRICK.id),
+        ("G", block.GLASS.id),
+        ("F", block.FENCE.id),
+    ),
+    layers=(
+        (1, (
+            "SSSSS",
+            "SSSSS",
+            "SSSSS",
+            "SSSSS",
+            "SSSSS",
+        )),
+        (2, (
+            "SSSSS",
+            "S...S",
+            "S...S",
+            "S...S",
+            "SS.SS",
+        )),
+        (4, (
+            "SSSSS",
+            "S...S",
+            "S...S",
+            "S...S",
+            "SSSSS",
+        )),
+        (1, (
+            "SSGSS",
+            "S...S",
+            "G...G",
+            "S...S",
+            "SSGSS",
+        )),
+        (4, (
+            "SSSSS",
+            "S...S",
+            "S...S",
+            "S...S",
+            "SSSSS",
+        )),
+        (1, (
+            "SSSSS",
+            "SSSSS",
+            "SSSSS",
+            "SSSSS",
+            "SSSSS",
+        )),
+        (1, (
+            "FFFFF",
+            "F...F",
+            "F...F",
+            "F...F",
+            "FFFFF",
+        )),
+    ),
+)
+
+BRIDGE = Blueprint(
+    name="bridge",
+    palette=(
+        ("P", block.WOOD_PLANKS.id),
+        ("W", block.WOOD.id),
+        ("F", block.FENCE.id),
+    ),
+    layers=(
+        (1, (
+            "W   W   W   W   W",
+            "PPPPPPPPPPPPPPPPP",
+            "PPPPPPPPPPPPPPPPP",
+            "PPPPPPPPPPPPPPPPP",
+            "W   W   W   W   W",
+        )),
+        (1, (
+            "FFFFFFFFFFFFFFFFF",
+            ".................",
+            ".................",
+            ".................",
+            "FFFFFFFFFFFFFFFFF",
+        )),
+        (1, (
+            "                 ",
+            ".................",
+            ".................",
+            ".................",
+            "                 ",
+        )),
+    ),
+)
+
+PLANS = {plan.name: plan for plan in (HOUSE, BRIDGE, TOWER)}
+
+
+@lru_cache(maxsize=64)
+def compile_plan(plan_name, origin):
+    """compile_blueprint for a named plan, cached per (plan, origin)."""
+    return compile_blueprint(PLANS[plan_name], tuple(origin))
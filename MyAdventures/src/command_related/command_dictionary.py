@@ -1,5 +1,5 @@
-from command_pattern import CommandPattern, AgentCommandSet
-from MyAdventures.src.command_related.command_registry import AgentNames
+from src.command_related.command_pattern import CommandPattern, AgentCommandSet
+from src.command_related.agent_names import AgentNames
 
 EXPLORER_COMMANDS = AgentCommandSet(
     agent_name=AgentNames.EXPLORER,
@@ -9,7 +9,7 @@ EXPLORER_COMMANDS = AgentCommandSet(
             command_name="set_range",
             description="Set exploration range",
             args_schema={
-                "range": {"type": "integer", "optional": False}
+                "range": {"type": "integer", "optional": False, "minimum": 1}
             },
             example="explorer set_range 50"
         ),
@@ -19,7 +19,7 @@ EXPLORER_COMMANDS = AgentCommandSet(
             args_schema={
                 "x": {"type": "integer", "optional": True},
                 "z": {"type": "integer", "optional": True},
-                "range": {"type": "integer", "optional": True}
+                "range": {"type": "integer", "optional": True, "minimum": 1}
             },
             example="explorer start x=100 z=200 range=50"
         ),
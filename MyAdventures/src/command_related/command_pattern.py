@@ -1,30 +1,92 @@
 from dataclasses import dataclass, field
 from typing import Dict, List, Any, Optional
 
+
+class CommandParseError(ValueError):
+    pass
+
+
+def _to_int(name, spec, raw):
+    try:
+        value = int(raw)
+    except ValueError:
+        raise CommandParseError(f"{name} must be an integer, got {raw!r}") from None
+    if "minimum" in spec and value < spec["minimum"]:
+        raise CommandParseError(f"{name} must be >= {spec['minimum']}")
+    if "maximum" in spec and value > spec["maximum"]:
+        raise CommandParseError(f"{name} must be <= {spec['maximum']}")
+    return value
+
+
+def _to_str(name, spec, raw):
+    return raw
+
+
+_CONVERTERS = {
+    "integer": _to_int,
+    "int": _to_int,
+    "string": _to_str,
+}
+
+
 @dataclass
 class CommandPattern:
     command_name: str
     args_schema: Dict[str, Any]
     description: str
     example: str
-    
+
+    def __post_init__(self):
+        # Resolved once so parse_args is a single pass over the tokens
+        self._converters = {
+            name: (_CONVERTERS[spec.get("type", "string")], spec, frozenset(spec.get("enum", ())))
+            for name, spec in self.args_schema.items()
+        }
+        self._order = list(self.args_schema)
+        self._required = frozenset(name for name, spec in self.args_schema.items() if not spec.get("optional", False))
+
     def parse_args(self, arg_string: str):
-        return {"raw": arg_string}
+        """Parse `key=value` and positional tokens (in schema order) against args_schema."""
+        parsed = {}
+        position = 0
+        for token in arg_string.split():
+            name, sep, raw = token.partition("=")
+            if not sep:
+                if position >= len(self._order):
+                    raise CommandParseError(f"unexpected argument {token!r}")
+                name, raw = self._order[position], token
+                position += 1
+
+            entry = self._converters.get(name)
+            if entry is None:
+                raise CommandParseError(f"unknown argument {name!r}")
+            if name in parsed:
+                raise CommandParseError(f"duplicate argument {name!r}")
+
+            convert, spec, allowed = entry
+            value = convert(name, spec, raw)
+            if allowed and value not in allowed:
+                raise CommandParseError(f"{name} must be one of {sorted(allowed)}")
+            parsed[name] = value
+
+        missing = self._required.difference(parsed)
+        if missing:
+            raise CommandParseError(f"missing argument(s): {', '.join(sorted(missing))}")
+        return parsed
 
 
 @dataclass
 class AgentCommandSet:
     agent_name: str
-    agent_class_name: str 
+    agent_class_name: str
     commands: List[CommandPattern] = field(default_factory=list)
-    
+
+    def __post_init__(self):
+        self._index = {cmd.command_name: cmd for cmd in self.commands}
+
     def get_command(self, command_name: str):
-        for cmd in self.commands:
-            if cmd.command_name == command_name:
-                return cmd
-        return None
-    
+        return self._index.get(command_name)
+
     def list_commands(self):
         return [cmd.command_name for cmd in self.commands]
 
-
@@ -1,63 +1,93 @@
+from functools import lru_cache
 from typing import Dict
-from command_dictionary import *
+from src.command_related.command_dictionary import *
+from src.command_related.command_pattern import CommandParseError
 
 class CommandRegistry:
-    
+
     _agents: Dict[str, AgentCommandSet] = {
         AgentNames.EXPLORER: EXPLORER_COMMANDS,
         AgentNames.BUILDER: BUILDER_COMMANDS,
         AgentNames.MINER: MINER_COMMANDS,
     }
-    
+    # (chat agent name, command name) -> CommandPattern, rebuilt on registration
+    _dispatch: Dict[tuple, CommandPattern] = {}
+    _by_name: Dict[str, AgentCommandSet] = {}
+
+    @staticmethod
+    def _key(agent_name):
+        return agent_name.value if isinstance(agent_name, AgentNames) else agent_name
+
+    @classmethod
+    def _compile(cls):
+        cls._by_name = {cls._key(name): commands for name, commands in cls._agents.items()}
+        cls._dispatch = {
+            (agent, cmd.command_name): cmd
+            for agent, commands in cls._by_name.items()
+            for cmd in commands.commands
+        }
+        _parse_cached.cache_clear()
+
     @classmethod
     def register_agent(cls, agent_commands: AgentCommandSet):
         cls._agents[agent_commands.agent_name] = agent_commands
-    
+        cls._compile()
+
     @classmethod
     def get_agent_commands(cls, agent_name: str):
-        return cls._agents.get(agent_name)
-    
+        return cls._by_name.get(cls._key(agent_name))
+
     @classmethod
     def get_all_agents(cls):
         return list(cls._agents.keys())
-    
+
     @classmethod
     def get_class_for_agent(cls, agent_name: str):
-        agent_commands = cls._agents.get(agent_name)
+        agent_commands = cls.get_agent_commands(agent_name)
         return agent_commands.agent_class_name if agent_commands else None
-    
+
     @classmethod
     def validate_command(cls, agent_name: str, command_name: str):
-        agent_commands = cls._agents.get(agent_name)
-        if not agent_commands:
-            return False
-        return agent_commands.get_command(command_name) is not None
-    
+        return (cls._key(agent_name), command_name) in cls._dispatch
+
     @classmethod
     def parse_chat_command(cls, chat_input: str):
-
-        parts = chat_input.strip().split(maxsplit=2)
-        
-        if len(parts) < 2:
-            return None
-        
-        agent_name = parts[0]
-        command_name = parts[1]
-        args_string = parts[2] if len(parts) > 2 else ""
-        
-        if not cls.validate_command(agent_name, command_name):
+        parsed = _parse_cached(chat_input.strip())
+        if parsed is None:
             return None
-        
-        agent_commands = cls.get_agent_commands(agent_name)
-        command_pattern = agent_commands.get_command(command_name)
-        
+
+        agent_name, command_name, args_string, args, command_pattern = parsed
         return {
             "agent": agent_name,
             "command": command_name,
             "args": args_string,
-            "parsed_args": command_pattern.parse_args(args_string) if command_pattern else {},
+            "parsed_args": dict(args),
             "pattern": command_pattern
         }
 
 
+@lru_cache(maxsize=1024)
+def _parse_cached(chat_input):
+    parts = chat_input.split(maxsplit=2)
+
+    if len(parts) < 2:
+        return None
+
+    agent_name = parts[0]
+    command_name = parts[1]
+    args_string = parts[2] if len(parts) > 2 else ""
+
+    command_pattern = CommandRegistry._dispatch.get((agent_name, command_name))
+    if command_pattern is None:
+        return None
+
+    try:
+        args = command_pattern.parse_args(args_string)
+    except CommandParseError:
+        return None
+
+    # Stored as a tuple so cached results can't be mutated by callers
+    return agent_name, command_name, args_string, tuple(args.items()), command_pattern
+
 
+CommandRegistry._compile()
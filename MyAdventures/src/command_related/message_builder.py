@@ -1,23 +1,26 @@
 from typing import Dict, List, Any, Optional
-from datetime import datetime
-from MyAdventures.src.command_related.command_registry import CommandRegistry
+from src.command_related.command_registry import CommandRegistry
+from src.communication.message import Message, resolve_type, resolve_agent
 
 
 
 class MessageBuilder:
     @staticmethod
     def create_command_message(agent_name: str, command_name: str, payload: Dict[str, Any], source: str = "user"):
-        return {
-            "type": command_name,
-            "source": source,
-            "target": agent_name,
-            "timestamp": datetime.now().isoformat(),
-            "payload": payload,
-            "context": []
-        }
+        return Message(
+            type=resolve_type(command_name),
+            source=resolve_agent(source),
+            target=resolve_agent(agent_name),
+            payload=payload
+        )
     
     @staticmethod
     def create_from_chat(chat_input: str):
+        """
+            Message for a chat command, or None. This is where chat input is
+            validated: only registered agent/command pairs whose arguments
+            parse come back, so the fields always satisfy message_schema.
+        """
         parsed = CommandRegistry.parse_chat_command(chat_input)
         
         if not parsed:
@@ -32,22 +35,18 @@ class MessageBuilder:
     
     @staticmethod
     def create_agent_to_agent_message(source_agent: str, target_agent: str, message_type: str, payload: Dict[str, Any]):
-        return {
-            "type": message_type,
-            "source": source_agent,
-            "target": target_agent,
-            "timestamp": datetime.now().isoformat(),
-            "payload": payload,
-            "context": []
-        }
+        return Message(
+            type=resolve_type(message_type),
+            source=resolve_agent(source_agent),
+            target=resolve_agent(target_agent),
+            payload=payload
+        )
     
     @staticmethod
     def create_broadcast_message(source_agent: str, message_type: str, payload: Dict[str, Any]):
-        return {
-            "type": message_type,
-            "source": source_agent,
-            "target": "ALL",  # Broadcast indicator
-            "timestamp": datetime.now().isoformat(),
-            "payload": payload,
-            "context": []
-        }
+        return Message(
+            type=resolve_type(message_type),
+            source=resolve_agent(source_agent),
+            target="ALL",  # Broadcast indicator
+            payload=payload
+        )
@@ -1,46 +1,155 @@
 import asyncio
+import time
+from dataclasses import dataclass, field
 from src.agents.base_agent import BaseAgent
 from src.utils.logging import Logger
-from MyAdventures.src.utils.minecraft_world import MinecraftWorld
+from src.communication.event_stream import EventStream
+from src.communication.message import Message, validate_message
+from src.command_related.message_builder import MessageBuilder
+from src.command_related.agent_names import AgentNames
 from src.utils.singleton import Singleton
+from src.utils.metrics import instrumented
+
+BROADCAST = "ALL"
+
+
+class DropPolicy:
+    BLOCK = "block"              # wait for room: backpressure up to the broker queue
+    DROP_NEWEST = "drop_newest"  # discard the message being routed
+    DROP_OLDEST = "drop_oldest"  # evict the oldest queued message to make room
+
+
+@dataclass
+class RoutingMetrics:
+    routed: int = 0
+    dropped: int = 0
+    unknown_target: int = 0
+    batches: int = 0
+    broker_high_water: int = 0
+    agent_high_water: dict = field(default_factory=dict)
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def routed_per_second(self):
+        elapsed = time.monotonic() - self.started
+        return self.routed / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        return {
+            "routed": self.routed,
+            "routed_per_second": round(self.routed_per_second, 1),
+            "dropped": self.dropped,
+            "unknown_target": self.unknown_target,
+            "batches": self.batches,
+            "broker_high_water": self.broker_high_water,
+            "agent_high_water": dict(self.agent_high_water),
+        }
 
 
 class MessageBroker(metaclass=Singleton):
-    def __init__(self):
+    def __init__(self, batch_size=64, policy=DropPolicy.BLOCK, validate_internal=False):
         self.logger = Logger()
-        self.mc = MinecraftWorld()
+        self.events = EventStream(chat_prefixes=tuple(name.value for name in AgentNames))
+
+        self.batch_size = batch_size
+        self.policy = policy
+        # Wire dicts are always validated; agent-built messages only on request
+        self.validate_internal = validate_internal
+        self.metrics = RoutingMetrics()
 
         self.message_queue = asyncio.Queue()
         self.agents = {}
-    
+        self._policies = {}
+
     async def run(self):
+        chat_posts = self.events.subscribe(EventStream.CHAT_POSTS)
+        # A TaskGroup cancels the other tasks when one fails, so a restarted
+        # broker never leaves a second poller or router behind
+        try:
+            async with asyncio.TaskGroup() as tasks:
+                tasks.create_task(self.events.run())
+                tasks.create_task(self._poll_chat(chat_posts))
+                tasks.create_task(self._route_messages())
+        finally:
+            self.events.unsubscribe(EventStream.CHAT_POSTS, chat_posts)
+
+    async def _poll_chat(self, chat_posts):
         while True:
-            # Concurrently handle multiple operations
-            await asyncio.gather(
-                self._poll_chat(),
-                self._route_messages(),
-                self._collect_agent_outputs()
-            ) 
-
-    async def _poll_chat(self):
-        msgs = await self.mc.poll_chat_messages()
-        for m in msgs:
-            if m and self.validate_message(m):
-                await self.message_queue.put(m)
+            post = await chat_posts.get()
+            # The command parser already rejected anything malformed; no
+            # need to format the message to wire form just to check it
+            msg = MessageBuilder.create_from_chat(post.message)
+            if msg is not None:
+                await self.message_queue.put(msg)
 
     async def _route_messages(self):
+        while True:
+            batch = [await self.message_queue.get()]
+            self.metrics.broker_high_water = max(self.metrics.broker_high_water, self.message_queue.qsize() + 1)
+            while len(batch) < self.batch_size and not self.message_queue.empty():
+                batch.append(self.message_queue.get_nowait())
+
+            self.metrics.batches += 1
+            for msg in batch:
+                await self._route(msg)
+
+    @instrumented("broker_route")
+    async def _route(self, msg):
+        target = msg.target_name
+        if target == BROADCAST:
+            await self.broadcast_messages(msg)
+            return
+
+        agent = self.agents.get(target)
+        if agent is None:
+            self.metrics.unknown_target += 1
+            self.logger.log_debug("MessageBroker", "route", "unknown target %r", target)
+            return
+
+        await self._deliver(target, agent, msg)
+
+    async def _deliver(self, name, agent, msg):
+        queue = agent.message_queue
         try:
-            msg = self.message_queue.get_nowait()
-            agent_id = msg.target
-            await self.agents[agent_id].put(msg)
-        except asyncio.QueueEmpty:
-            pass
+            queue.put_nowait(msg)
+        except asyncio.QueueFull:
+            match self._policies.get(name, self.policy):
+                case DropPolicy.BLOCK:
+                    await queue.put(msg)
+                case DropPolicy.DROP_OLDEST:
+                    queue.get_nowait()
+                    queue.put_nowait(msg)
+                    self.metrics.dropped += 1
+                case _:
+                    self.metrics.dropped += 1
+                    return
 
-    def add_agent(self, name, agent : BaseAgent):
+        self.metrics.routed += 1
+        depth = queue.qsize()
+        if depth > self.metrics.agent_high_water.get(name, 0):
+            self.metrics.agent_high_water[name] = depth
+
+    def add_agent(self, name, agent : BaseAgent, policy=None):
         self.agents[name] = agent
+        if policy is not None:
+            self._policies[name] = policy
 
     def input_message(self, message):
-        self.message_queue.put_nowait(message) 
+        # Wire dicts come from outside this process; Message objects are ours
+        if isinstance(message, dict):
+            valid = validate_message(message)
+        else:
+            valid = not self.validate_internal or validate_message(message.to_wire())
+
+        if not valid:
+            self.logger.log_debug("MessageBroker", "input", "rejected %r", message)
+            return
+        if isinstance(message, dict):
+            message = Message.from_wire(message)
+        self.message_queue.put_nowait(message)
 
-    async def broadcast_messages(self):
-        pass
\ No newline at end of file
+    async def broadcast_messages(self, message):
+        source = message.source_name
+        for name, agent in self.agents.items():
+            if name != source:
+                await self._deliver(name, agent, message)
@@ -0,0 +1,267 @@
+import struct
+import zlib
+from enum import Enum, IntEnum
+from src.command_related.agent_names import AgentNames
+from src.communication.message import Message, WALL_CLOCK_OFFSET, resolve_type, resolve_agent
+from src.reflection.message_types import InnerCommand, StatusCommand, PassiveCommand
+
+"""
+    Binary wire format for Message.
+
+    Frame: schema id (uint16), timestamp (float64 epoch seconds), status
+    (uint8), then type, source and target as symbols, the context list and
+    the payload value. A symbol is one byte indexing SYMBOLS, or 0 followed
+    by an inline string for names outside the table.
+
+    Values are tagged msgpack-style; NumPy scalars travel as the matching
+    Python value. Buffers (array.array, memoryview, C-contiguous numpy
+    arrays, bool arrays included) are written raw, 8-byte aligned, and
+    decode to memoryviews over the input buffer without copying; an empty
+    buffer decodes to an empty 1-D view whatever its shape. Multi-byte
+    values use the host byte order (little-endian on every platform we run
+    on).
+"""
+
+SYMBOLS = sorted(
+    {member.value for enum in (InnerCommand, StatusCommand, PassiveCommand, AgentNames) for member in enum}
+    | {"ALL", "User"}
+)
+SCHEMA_ID = zlib.crc32("\n".join(SYMBOLS).encode()) & 0xFFFF
+_SYMBOL_CODES = {symbol: code for code, symbol in enumerate(SYMBOLS, start=1)}
+_STATUSES = (None, "SUCCESS", "FAILED")
+
+_HEADER = struct.Struct("<HdB")
+_FLOAT = struct.Struct("<d")
+_ARRAY_FORMATS = frozenset("?bBhHiIqQfd")
+_ALIGN = 8
+
+
+class Tag(IntEnum):
+    NONE = 0
+    FALSE = 1
+    TRUE = 2
+    INT = 3
+    FLOAT = 4
+    STR = 5
+    BYTES = 6
+    LIST = 7
+    DICT = 8
+    ARRAY = 9
+
+
+class CodecError(ValueError):
+    pass
+
+
+def encode(message):
+    out = bytearray(_HEADER.pack(SCHEMA_ID, message.created + WALL_CLOCK_OFFSET, _STATUSES.index(message.status)))
+    for symbol in (message.type, message.source, message.target):
+        _write_symbol(out, symbol.value if isinstance(symbol, Enum) else symbol)
+    _write_varint(out, len(message.context))
+    for item in message.context:
+        _write_str(out, item)
+    _write_value(out, message.payload)
+    return bytes(out)
+
+
+def decode(data):
+    view = memoryview(data)
+    schema_id, timestamp, status = _HEADER.unpack_from(view)
+    if schema_id != SCHEMA_ID:
+        raise CodecError(f"schema id {schema_id:#06x} does not match {SCHEMA_ID:#06x}")
+
+    pos = _HEADER.size
+    msg_type, pos = _read_symbol(view, pos)
+    source, pos = _read_symbol(view, pos)
+    target, pos = _read_symbol(view, pos)
+    count, pos = _read_varint(view, pos)
+    context = []
+    for _ in range(count):
+        item, pos = _read_str(view, pos)
+        context.append(item)
+    payload, pos = _read_value(view, pos)
+
+    return Message(
+        type=resolve_type(msg_type),
+        source=resolve_agent(source),
+        target=resolve_agent(target),
+        created=timestamp - WALL_CLOCK_OFFSET,
+        payload=payload,
+        status=_STATUSES[status],
+        context=tuple(context),
+    )
+
+
+def encode_value(value):
+    out = bytearray()
+    _write_value(out, value)
+    return bytes(out)
+
+
+def decode_value(data):
+    return _read_value(memoryview(data), 0)[0]
+
+
+def _write_varint(out, n):
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(view, pos):
+    shift = result = 0
+    while True:
+        byte = view[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _write_str(out, s):
+    raw = s.encode("utf-8")
+    _write_varint(out, len(raw))
+    out += raw
+
+
+def _read_str(view, pos):
+    size, pos = _read_varint(view, pos)
+    return str(view[pos:pos + size], "utf-8"), pos + size
+
+
+def _write_symbol(out, symbol):
+    code = _SYMBOL_CODES.get(symbol)
+    if code is None:
+        out.append(0)
+        _write_str(out, symbol)
+    else:
+        out.append(code)
+
+
+def _read_symbol(view, pos):
+    code = view[pos]
+    if code == 0:
+        return _read_str(view, pos + 1)
+    return SYMBOLS[code - 1], pos + 1
+
+
+def _write_value(out, value):
+    if value is None:
+        out.append(Tag.NONE)
+    elif value is True or value is False:
+        out.append(Tag.TRUE if value else Tag.FALSE)
+    elif isinstance(value, int):
+        if not -2**63 <= value < 2**63:
+            raise CodecError(f"integer {value} does not fit in 64 bits")
+        out.append(Tag.INT)
+        # Zigzag so small negative numbers stay short
+        _write_varint(out, (value << 1) ^ (value >> 63))
+    elif isinstance(value, float):
+        out.append(Tag.FLOAT)
+        out += _FLOAT.pack(value)
+    elif isinstance(value, Enum):
+        _write_value(out, value.value)
+    elif isinstance(value, str):
+        out.append(Tag.STR)
+        _write_str(out, value)
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(Tag.BYTES)
+        _write_varint(out, len(value))
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out.append(Tag.LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _write_value(out, item)
+    elif isinstance(value, dict):
+        out.append(Tag.DICT)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            _write_value(out, key)
+            _write_value(out, item)
+    elif hasattr(value, "dtype") and getattr(value, "ndim", None) == 0:
+        # NumPy scalar (np.int64, np.bool_, ...) or 0-d array
+        _write_value(out, value.item())
+    else:
+        _write_array(out, value)
+
+
+def _write_array(out, value):
+    try:
+        view = memoryview(value)
+    except TypeError:
+        raise CodecError(f"cannot encode {type(value).__name__}") from None
+
+    fmt = view.format.lstrip("@=<")
+    if fmt == "l" or fmt == "L":
+        fmt = {4: "i", 8: "q"}[view.itemsize] if fmt == "l" else {4: "I", 8: "Q"}[view.itemsize]
+    if fmt not in _ARRAY_FORMATS or not view.c_contiguous:
+        raise CodecError(f"unsupported buffer format {view.format!r}")
+
+    out.append(Tag.ARRAY)
+    out += fmt.encode("ascii")
+    out.append(view.ndim)
+    for dim in view.shape:
+        _write_varint(out, dim)
+    _write_varint(out, view.nbytes)
+    out += bytes(-len(out) % _ALIGN)
+    if view.nbytes:
+        out += view.cast("B")
+
+
+def _read_array(view, pos):
+    fmt = chr(view[pos])
+    ndim = view[pos + 1]
+    pos += 2
+    shape = []
+    for _ in range(ndim):
+        dim, pos = _read_varint(view, pos)
+        shape.append(dim)
+    nbytes, pos = _read_varint(view, pos)
+    pos += -pos % _ALIGN
+    raw = view[pos:pos + nbytes]
+    if nbytes == 0:
+        # memoryview cannot carry a shape with zeros; an empty 1-D view will do
+        return raw.cast(fmt), pos
+    return raw.cast(fmt, shape), pos + nbytes
+
+
+def _read_value(view, pos):
+    tag = view[pos]
+    pos += 1
+    match tag:
+        case Tag.NONE:
+            return None, pos
+        case Tag.FALSE:
+            return False, pos
+        case Tag.TRUE:
+            return True, pos
+        case Tag.INT:
+            n, pos = _read_varint(view, pos)
+            return (n >> 1) ^ -(n & 1), pos
+        case Tag.FLOAT:
+            return _FLOAT.unpack_from(view, pos)[0], pos + _FLOAT.size
+        case Tag.STR:
+            return _read_str(view, pos)
+        case Tag.BYTES:
+            size, pos = _read_varint(view, pos)
+            return bytes(view[pos:pos + size]), pos + size
+        case Tag.LIST:
+            count, pos = _read_varint(view, pos)
+            items = []
+            for _ in range(count):
+                item, pos = _read_value(view, pos)
+                items.append(item)
+            return items, pos
+        case Tag.DICT:
+            count, pos = _read_varint(view, pos)
+            result = {}
+            for _ in range(count):
+                key, pos = _read_value(view, pos)
+                result[key], pos = _read_value(view, pos)
+            return result, pos
+        case Tag.ARRAY:
+            return _read_array(view, pos)
+    raise CodecError(f"unknown tag {tag} at offset {pos - 1}")
@@ -0,0 +1,105 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from src.utils.logging import Logger
+from src.utils.minecraft_world import MinecraftWorld
+
+
+@dataclass
+class PollMetrics:
+    polls: int = 0
+    events: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def poll_rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.polls / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def events_per_poll(self):
+        return self.events / self.polls if self.polls else 0.0
+
+    def snapshot(self):
+        return {
+            "polls": self.polls,
+            "events": self.events,
+            "poll_rate": round(self.poll_rate, 2),
+            "events_per_poll": round(self.events_per_poll, 3),
+        }
+
+
+class EventStream:
+    """
+        Polls block hits and chat posts on an adaptive interval and publishes
+        them to asyncio subscribers. The interval drops to `min_interval` as
+        soon as a poll returns events and grows by `backoff` while idle.
+        `chat_prefixes` is handed to the chat parser so unrelated chat is
+        skipped before any ChatEvent is built.
+    """
+    BLOCK_HITS = "block_hits"
+    CHAT_POSTS = "chat_posts"
+
+    def __init__(self, min_interval=0.05, max_interval=1.0, backoff=1.5, chat_prefixes=None):
+        self.logger = Logger()
+        # A stalled subscriber drops every event of every poll
+        self.logger.sample_debug("EventStream", "publish", 100)
+        self.mc = MinecraftWorld()
+
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self.chat_prefixes = chat_prefixes
+
+        self.metrics = PollMetrics()
+        self._subscribers = {EventStream.BLOCK_HITS: [], EventStream.CHAT_POSTS: []}
+        self._sources = {
+            EventStream.BLOCK_HITS: self.mc.poll_block_hits,
+            EventStream.CHAT_POSTS: lambda: self.mc.poll_chat_posts(self.chat_prefixes),
+        }
+
+    def subscribe(self, kind, maxsize=0):
+        queue = asyncio.Queue(maxsize=maxsize)
+        self._subscribers[kind].append(queue)
+        return queue
+
+    def unsubscribe(self, kind, queue):
+        if queue in self._subscribers[kind]:
+            self._subscribers[kind].remove(queue)
+
+    async def run(self):
+        while True:
+            published = self.poll_once()
+            self._adapt(published)
+            await asyncio.sleep(self.interval)
+
+    def poll_once(self):
+        published = 0
+
+        for kind, source in self._sources.items():
+            subscribers = self._subscribers[kind]
+            if not subscribers:
+                continue
+
+            # mcpi hands out each event once, so repeats are real repeats
+            for event in source():
+                published += 1
+                for queue in subscribers:
+                    self._publish(queue, event)
+
+        self.metrics.polls += 1
+        self.metrics.events += published
+        return published
+
+    def _publish(self, queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.logger.log_debug("EventStream", "publish", "subscriber full, dropped %r", event)
+
+    def _adapt(self, published):
+        if published:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
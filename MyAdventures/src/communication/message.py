@@ -1,5 +1,13 @@
-import jsonschema
-from jsonschema import FormatChecker, validate
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Optional, Tuple, Union
+from jsonschema import FormatChecker
+from jsonschema.validators import validator_for
+from src.command_related.agent_names import AgentNames
+from src.reflection.message_types import InnerCommand, StatusCommand, PassiveCommand
+from src.utils.metrics import instrumented
 
 message_schema = {
     "type": "object",
@@ -29,16 +37,135 @@ message_schema = {
     }
 }
 
+# Built once: checking the schema and resolving format checkers per call
+# dominated routing cost
+_validator_cls = validator_for(message_schema)
+_validator_cls.check_schema(message_schema)
+schema_validator = _validator_cls(message_schema, format_checker=FormatChecker())
+
+_REQUIRED = ("type", "source", "target", "timestamp")
+_ALLOWED = frozenset(message_schema["properties"])
+_STATUSES = frozenset(message_schema["properties"]["status"]["enum"])
+
+
+def _is_string_list(value):
+    return type(value) is list and all(type(item) is str for item in value)
+
+
+def fast_check(message):
+    """Hand-written equivalent of message_schema; no jsonschema machinery.
+
+    Timestamps are accepted when datetime.fromisoformat parses them, which
+    covers what MessageBuilder produces.
+    """
+    if type(message) is not dict or not _ALLOWED.issuperset(message):
+        return False
+
+    for key in _REQUIRED:
+        if type(message.get(key)) is not str:
+            return False
 
-def validate_message(message):
-    """Return True when a message matches the schema; False otherwise."""
     try:
-        validate(instance=message, schema=message_schema, format_checker=FormatChecker())
+        datetime.fromisoformat(message["timestamp"])
+    except ValueError:
+        return False
+
+    if "payload" in message:
+        payload = message["payload"]
+        if type(payload) is not dict and not _is_string_list(payload):
+            return False
+    if "status" in message and message["status"] not in _STATUSES:
+        return False
+    if "context" in message and not _is_string_list(message["context"]):
+        return False
+
+    return True
+
+
+@instrumented("message_validation")
+def validate_message(message, trusted=False, strict=False):
+    """Return True when a message matches the schema; False otherwise.
+
+    `trusted` messages (built by our own agents) skip the schema check and
+    only get the source/target sanity check; use it for internal traffic and
+    keep full validation for chat input. `strict` runs the jsonschema
+    validator instead of the fast path.
+    """
+    if not trusted:
+        if strict:
+            if not schema_validator.is_valid(message):
+                return False
+        elif not fast_check(message):
+            return False
+
+    return message.get("source") != message.get("target")
 
-        if message.get("source") == message.get("target"):
-            raise ValueError("Source and target cannot be the same")
 
-        return True
+# Offset that turns time.monotonic() readings into wall-clock epoch seconds
+WALL_CLOCK_OFFSET = time.time() - time.monotonic()
+_TYPES = {member.value: member for enum in (InnerCommand, StatusCommand, PassiveCommand) for member in enum}
+_AGENTS = {name.value: name for name in AgentNames}
+
+
+def _wire(value):
+    return value.value if isinstance(value, Enum) else value
+
+
+def resolve_type(value):
+    """Map a wire command name onto its InnerCommand/StatusCommand/PassiveCommand member."""
+    return _TYPES.get(_wire(value), value)
+
+
+def resolve_agent(value):
+    """Map an agent name onto its AgentNames member; other names stay strings."""
+    return _AGENTS.get(_wire(value), value)
+
+
+@dataclass(frozen=True, slots=True)
+class Message:
+    """
+        In-process message. Timestamps are time.monotonic() readings and are
+        only formatted as ISO strings by to_wire(); `type` and `target` hold
+        enum members whenever the value is a known command or agent.
+    """
+    type: Union[Enum, str]
+    source: Union[AgentNames, str]
+    target: Union[AgentNames, str]
+    created: float = field(default_factory=time.monotonic)
+    payload: Any = None
+    status: Optional[str] = None
+    context: Tuple[str, ...] = ()
+
+    @property
+    def source_name(self):
+        return _wire(self.source)
+
+    @property
+    def target_name(self):
+        return _wire(self.target)
+
+    def to_wire(self):
+        wire = {
+            "type": _wire(self.type),
+            "source": _wire(self.source),
+            "target": _wire(self.target),
+            "timestamp": datetime.fromtimestamp(self.created + WALL_CLOCK_OFFSET).isoformat(),
+            "context": list(self.context),
+        }
+        if self.payload is not None:
+            wire["payload"] = self.payload
+        if self.status is not None:
+            wire["status"] = self.status
+        return wire
 
-    except (jsonschema.exceptions.ValidationError, ValueError):
-        return False
\ No newline at end of file
+    @classmethod
+    def from_wire(cls, wire):
+        return cls(
+            type=resolve_type(wire["type"]),
+            source=resolve_agent(wire["source"]),
+            target=resolve_agent(wire["target"]),
+            created=datetime.fromisoformat(wire["timestamp"]).timestamp() - WALL_CLOCK_OFFSET,
+            payload=wire.get("payload"),
+            status=wire.get("status"),
+            context=tuple(wire.get("context", ())),
+        )
@@ -0,0 +1,223 @@
+import asyncio
+import multiprocessing
+import numpy as np
+from src.communication.codec import encode, decode, encode_value, decode_value
+from src.reflection.states import State
+from src.utils.logging import Logger
+from src.utils.metrics import Metrics
+from src.utils.rate_limiter import RateLimiter
+from src.utils.world_snapshot import SnapshotReader
+from src.world.chunk_store import MISSING, SECTION
+from src.world.world_model import WorldModel
+
+"""
+    Runs a group of agents in a worker process. The parent keeps one
+    AgentProxy per remote agent so the broker and supervisor can treat it
+    like a local agent; messages (binary-encoded by codec) and status reports
+    cross a multiprocessing Pipe as ("message", ...) / ("status", ...) tuples.
+    With `metrics` set the worker enables its own Metrics and each status
+    report carries their state(), merged into the parent's exporters.
+
+    The parent's WorldModel is the shared world. It publishes chunks to a
+    shared-memory WorldSnapshot and only sends ("chunks", [(cx, cz), ...],
+    [imported (cx, cz), ...]); the worker copies those chunks from the
+    snapshot into its own WorldModel, keeping chunks the parent loaded from
+    region files marked as imported. Changes the worker's agents make go
+    the other way as ("world", "fill", corners, block id) and ("world",
+    "ingest", codec-encoded cuboids); once the parent applies them they
+    come back to every worker through the snapshot.
+"""
+
+
+class AgentProxy:
+    def __init__(self, agent_name, queue_size):
+        self.agent_name = agent_name
+        self.message_queue = asyncio.Queue(maxsize=queue_size)
+        self.state = State.IDLE
+        self.cycles = 0
+        self.cpu_time = 0.0
+
+
+class WorkerProcess:
+    def __init__(self, agent_classes, outbox, io_rate=20, status_interval=0.5, snapshot=None, metrics=False):
+        self.logger = Logger()
+        self.agent_classes = list(agent_classes)
+        self.outbox = outbox
+        self.io_rate = io_rate
+        self.status_interval = status_interval
+        # (prefix, y_min, height) of the WorldSnapshot the worker reads terrain from
+        self.snapshot = snapshot
+        self.metrics = metrics
+        self._conn = None
+        # Every chunk shared so far, replayed to a restarted worker
+        self._shared = set()
+        self._imported = set()
+
+        self.proxies = {cls.agent_name.value: AgentProxy(cls.agent_name, cls.queue_size) for cls in self.agent_classes}
+        self.process = None
+
+    @property
+    def name(self):
+        return "+".join(self.proxies)
+
+    async def run(self):
+        context = multiprocessing.get_context("spawn")
+        conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(self.agent_classes, child_conn, self.io_rate, self.status_interval, self.snapshot, self.metrics),
+            name=f"agents-{self.name}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self._conn = conn
+        if self._shared:
+            conn.send(("chunks", sorted(self._shared), sorted(self._imported)))
+        self.logger.log_info("WorkerProcess", "start", "%s in pid %s", self.name, self.process.pid)
+
+        try:
+            # Forwarders must not outlive the pipe: a failed receiver cancels them
+            async with asyncio.TaskGroup() as tasks:
+                tasks.create_task(self._receive(conn))
+                for name, proxy in self.proxies.items():
+                    tasks.create_task(self._forward(conn, name, proxy))
+        finally:
+            self._conn = None
+            self.process.terminate()
+            self.process.join(timeout=1)
+            conn.close()
+
+    def share_chunks(self, coords, imported=()):
+        """Tell the worker these snapshot chunks changed; `imported` ones came from region files."""
+        if self.snapshot is None:
+            return
+        self._shared.update(coords)
+        self._imported.difference_update(coords)
+        self._imported.update(imported)
+        if self._conn is not None:
+            self._conn.send(("chunks", list(coords), list(imported)))
+
+    async def _forward(self, conn, name, proxy):
+        while True:
+            msg = await proxy.message_queue.get()
+            conn.send(("message", name, encode(msg)))
+
+    async def _receive(self, conn):
+        while True:
+            try:
+                kind, *body = await asyncio.to_thread(conn.recv)
+            except (EOFError, OSError):
+                raise RuntimeError(f"worker {self.name} exited with code {self.process.exitcode}")
+
+            match kind:
+                case "message":
+                    self.outbox(decode(body[0]))
+                case "status":
+                    statuses, metrics = body
+                    for name, state, cycles, cpu_time in statuses:
+                        proxy = self.proxies[name]
+                        proxy.state = State(state)
+                        proxy.cycles = cycles
+                        proxy.cpu_time = cpu_time
+                    if metrics is not None:
+                        Metrics().merge(self.name, metrics)
+                case "world":
+                    _apply_world_change(WorldModel(), *body)
+
+
+def _apply_world_change(world, change, *args):
+    """Replay a worker's WorldModel change on the parent's."""
+    match change:
+        case "fill":
+            corners, block_id = args
+            world.fill(*corners, block_id)
+        case "ingest":
+            cuboids = decode_value(args[0])
+            world.ingest_many([(*cuboid[:6], np.asarray(cuboid[6])) for cuboid in cuboids], imported=args[1])
+
+
+def _forward_world(world, conn):
+    """Send the changes agents make to this process's WorldModel to the parent."""
+    world.listeners.append(lambda corners, block_id: conn.send(("world", "fill", corners, block_id)))
+    world.ingest_listeners.append(
+        lambda cuboids, imported: conn.send(("world", "ingest", encode_value(cuboids), imported))
+    )
+
+
+def _worker_main(agent_classes, conn, io_rate, status_interval, snapshot, metrics):
+    if metrics:
+        Metrics().enable()
+    asyncio.run(_worker_loop(agent_classes, conn, io_rate, status_interval, snapshot))
+
+
+async def _worker_loop(agent_classes, conn, io_rate, status_interval, snapshot):
+    agents = {}
+    for agent_cls in agent_classes:
+        agent = agent_cls()
+        agent.io_limiter = RateLimiter(io_rate)
+        agent.outbox = lambda msg: conn.send(("message", encode(msg)))
+        agents[agent.agent_name.value] = agent
+    _forward_world(WorldModel(), conn)
+
+    reader = SnapshotReader(*snapshot) if snapshot is not None else None
+    try:
+        await asyncio.gather(
+            _worker_inbound(conn, agents, reader),
+            _worker_status(conn, agents, status_interval),
+            *[agent.run() for agent in agents.values()]
+        )
+    finally:
+        if reader is not None:
+            reader.close()
+
+
+async def _worker_inbound(conn, agents, reader):
+    while True:
+        try:
+            kind, *body = await asyncio.to_thread(conn.recv)
+        except EOFError:
+            # Parent went away
+            raise SystemExit(0)
+
+        match kind:
+            case "message":
+                name, msg = body
+                await agents[name].message_queue.put(decode(msg))
+            case "chunks":
+                _load_chunks(reader, WorldModel(), *body)
+
+
+def _load_chunks(reader, world, coords, imported):
+    """Copy published chunks into `world`, skipping sections the parent never surveyed."""
+    imported = set(imported)
+    cuboids = {False: [], True: []}
+    for cx, cz in coords:
+        view = reader.chunk(cx, cz)
+        if view is None:
+            continue
+        blocks = view.read()
+        x0, z0 = cx * SECTION, cz * SECTION
+        known = [not (blocks[y:y + SECTION] == MISSING).any() for y in range(0, view.height, SECTION)]
+        # One cuboid per run of known sections
+        y = 0
+        while y < len(known):
+            if not known[y]:
+                y += 1
+                continue
+            end = y
+            while end < len(known) and known[end]:
+                end += 1
+            y0 = view.y_min + y * SECTION
+            cuboids[(cx, cz) in imported].append((x0, y0, z0, x0 + SECTION - 1, view.y_min + end * SECTION - 1, z0 + SECTION - 1, blocks[y * SECTION:end * SECTION]))
+            y = end
+    for from_regions, batch in cuboids.items():
+        world.ingest_many(batch, imported=from_regions, notify=False)
+
+
+async def _worker_status(conn, agents, interval):
+    metrics = Metrics()
+    while True:
+        statuses = [(name, agent.state.value, agent.cycles, agent.cpu_time) for name, agent in agents.items()]
+        conn.send(("status", statuses, metrics.state() if metrics.enabled else None))
+        await asyncio.sleep(interval)
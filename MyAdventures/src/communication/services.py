@@ -1,10 +1,11 @@
 from mailbox import Message
-from MyAdventures.src.utils.minecraft_world import MinecraftWorld
-from src.utils.dynamic_discovery import discover_agents
+from src.utils.minecraft_world import MinecraftWorld
+from src.utils.dynamic_discovery import agent_names
 class ChatService:
     def __init__(self):
         self.mc = MinecraftWorld()
-        agents_ids = discover_agents()
+        # Names come from the cached manifest; no agent module is imported here
+        agents_ids = agent_names()
     
     async def poll_chat(self):
         raw_msgs = await self.mc.poll_chat_messages()
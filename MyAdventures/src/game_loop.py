@@ -0,0 +1,206 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from src.communication.broker import MessageBroker
+from src.communication.process_bridge import WorkerProcess
+from src.reflection.states import State
+from src.utils.logging import Logger
+from src.utils.metrics import Metrics
+from src.utils.rate_limiter import RateLimiter
+from src.utils.world_snapshot import WorldSnapshot
+from src.world.chunk_store import SECTION
+from src.world.region_loader import import_regions
+from src.world.world_model import WorldModel
+
+
+@dataclass
+class AgentRecord:
+    agent: object
+    restarts: int = 0
+    last_cycles: int = 0
+    cycle_rate: float = 0.0
+
+
+class Supervisor:
+    """
+        Runs every agent and the MessageBroker in one event loop. Each agent
+        gets its own world I/O rate limit, and crashed components are
+        restarted with exponential backoff. `shards` lists groups of agent
+        names to run in their own worker process instead of this loop; they
+        get this process's terrain through a shared-memory WorldSnapshot.
+        Setting `metrics_port` or `metrics_dump` turns on instrumentation,
+        worker processes included, and exports it over HTTP or to a JSON
+        file. `region_dir` preloads the world model of this process from the
+        server's region files, decoded on all cores.
+    """
+
+    def __init__(self, agent_classes, io_rate=20, backoff_base=0.5, backoff_max=30.0, report_interval=5.0, shards=(), metrics_port=None, metrics_dump=None, region_dir=None):
+        self.logger = Logger()
+        self.broker = MessageBroker()
+
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.report_interval = report_interval
+        self.metrics_port = metrics_port
+        self.metrics_dump = metrics_dump
+
+        if region_dir is not None:
+            import_regions(WorldModel(), region_dir)
+
+        self.records = {}
+        self.local_agents = []
+        self.workers = []
+        by_name = {agent_cls.agent_name.value: agent_cls for agent_cls in agent_classes}
+
+        self.snapshot = WorldSnapshot(prefix=f"mcworld{os.getpid()}") if shards else None
+        snapshot = (self.snapshot.prefix, self.snapshot.y_min, self.snapshot.height) if self.snapshot else None
+        for group in shards:
+            worker = WorkerProcess(
+                [by_name.pop(name) for name in group], self.broker.input_message, io_rate,
+                snapshot=snapshot, metrics=metrics_port is not None or metrics_dump is not None
+            )
+            self.workers.append(worker)
+            for name, proxy in worker.proxies.items():
+                self.records[name] = AgentRecord(proxy)
+                self.broker.add_agent(name, proxy)
+
+        for name, agent_cls in by_name.items():
+            agent = agent_cls()
+            agent.io_limiter = RateLimiter(io_rate)
+            agent.outbox = self.broker.input_message
+            self.local_agents.append(name)
+            self.records[name] = AgentRecord(agent)
+            self.broker.add_agent(name, agent)
+
+    async def run(self):
+        # A TaskGroup cancels every other task when one fails or the run is
+        # cancelled, where gather would leave them running unowned
+        async with asyncio.TaskGroup() as tasks:
+            tasks.create_task(self._supervise("broker", self.broker.run))
+            for worker in self.workers:
+                records = [self.records[name] for name in worker.proxies]
+                tasks.create_task(self._supervise(worker.name, worker.run, *records))
+            for name in self.local_agents:
+                record = self.records[name]
+                tasks.create_task(self._supervise(name, record.agent.run, record))
+            tasks.create_task(self._report())
+            if self.snapshot is not None:
+                tasks.create_task(self._share_world())
+
+            metrics = Metrics()
+            if self.metrics_port is not None:
+                metrics.enable()
+                tasks.create_task(metrics.serve(port=self.metrics_port))
+            if self.metrics_dump is not None:
+                metrics.enable()
+                tasks.create_task(metrics.dump_json(self.metrics_dump))
+
+    async def _supervise(self, name, run, *records):
+        failures = 0
+        while True:
+            started = time.monotonic()
+            try:
+                await run()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.log_error("Supervisor", "crash", "%s: %r", name, e)
+
+            # A component that ran for a while before crashing starts over
+            if time.monotonic() - started > self.backoff_max:
+                failures = 0
+            delay = min(self.backoff_base * 2 ** failures, self.backoff_max)
+            failures += 1
+
+            for record in records:
+                record.restarts += 1
+                record.agent.state = State.ERROR
+
+            await asyncio.sleep(delay)
+
+            for record in records:
+                record.agent.state = State.IDLE
+            self.logger.log_info("Supervisor", "restart", "%s after %.1fs", name, delay)
+
+    async def _share_world(self, interval=0.5):
+        """Publish chunks the world model changed to the snapshot and tell the workers."""
+        world = WorldModel()
+        snapshot = self.snapshot
+        published = {}
+        try:
+            while True:
+                changed = [key for key, revision in world.chunk_revisions.items() if published.get(key) != revision]
+                for cx, cz in changed:
+                    x0, z0 = cx * SECTION, cz * SECTION
+                    snapshot.publish_chunk(cx, cz, world.store.read_cuboid(
+                        x0, snapshot.y_min, z0, x0 + SECTION - 1, snapshot.y_min + snapshot.height - 1, z0 + SECTION - 1
+                    ))
+                    published[(cx, cz)] = world.chunk_revisions[(cx, cz)]
+                if changed:
+                    for worker in self.workers:
+                        worker.share_chunks(changed, [key for key in changed if key in world.imported])
+                await asyncio.sleep(interval)
+        finally:
+            snapshot.close()
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            for record in self.records.values():
+                cycles = record.agent.cycles
+                record.cycle_rate = (cycles - record.last_cycles) / self.report_interval
+                record.last_cycles = cycles
+            self.export_metrics()
+            print(self.format_table())
+
+    def export_metrics(self):
+        """Copy the broker's routing and polling counters into Metrics gauges for the exporters."""
+        metrics = Metrics()
+        routing = self.broker.metrics.snapshot()
+        for key in ("routed", "routed_per_second", "dropped", "unknown_target", "batches"):
+            metrics.gauge_set(f"broker_{key}", routing[key])
+        metrics.gauge_set("broker_queue_high_water", routing["broker_high_water"])
+        for name, depth in routing["agent_high_water"].items():
+            metrics.gauge_set("agent_queue_high_water", depth, (("agent", name),))
+        for key, value in self.broker.events.metrics.snapshot().items():
+            metrics.gauge_set(f"event_stream_{key}", value)
+
+    def status_table(self):
+        high_water = self.broker.metrics.agent_high_water
+        return [
+            {
+                "agent": name,
+                "state": record.agent.state.value,
+                "cycle_rate": record.cycle_rate,
+                "queue_depth": record.agent.message_queue.qsize(),
+                "queue_high_water": high_water.get(name, 0),
+                "restarts": record.restarts,
+                "cpu_time": record.agent.cpu_time,
+            }
+            for name, record in self.records.items()
+        ]
+
+    def format_table(self):
+        lines = [f"{'AGENT':<10} {'STATE':<8} {'CYCLES/S':>9} {'QUEUE':>6} {'PEAK':>6} {'RESTARTS':>9} {'CPU S':>8}"]
+        for row in self.status_table():
+            lines.append(
+                f"{row['agent']:<10} {row['state']:<8} {row['cycle_rate']:>9.1f} "
+                f"{row['queue_depth']:>6} {row['queue_high_water']:>6} {row['restarts']:>9} {row['cpu_time']:>8.3f}"
+            )
+        routing = self.broker.metrics
+        lines.append(
+            f"broker: {routing.routed} routed ({routing.routed_per_second:.1f}/s), {routing.dropped} dropped, "
+            f"{routing.unknown_target} unknown target, queue peak {routing.broker_high_water}"
+        )
+        polling = self.broker.events.metrics
+        lines.append(
+            f"events: {polling.polls} polls ({polling.poll_rate:.1f}/s), "
+            f"{polling.events} events ({polling.events_per_poll:.2f}/poll), interval {self.broker.events.interval:.2f}s"
+        )
+        return "\n".join(lines)
+
+
+async def game_loop(agent_classes, **options):
+    await Supervisor(agent_classes, **options).run()
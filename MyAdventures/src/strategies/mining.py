@@ -0,0 +1,87 @@
+from abc import ABC, abstractmethod
+import numpy as np
+import mcpi.block as block
+from src.world.boxes import merge_boxes, to_world
+from src.world.ore_index import ORES
+from src.world.world_model import LIQUIDS
+
+"""
+    Mining strategies. Each one names the volume it works on, read with a
+    single getBlocks, and picks the blocks in it to clear; plan() turns that
+    choice into merged AIR cuboids.
+"""
+
+AIR = block.AIR.id
+# Never dug: bedrock can't be, liquids would just flow into the hole
+UNMINEABLE = frozenset((block.BEDROCK.id,)) | LIQUIDS
+
+
+class MiningStrategy(ABC):
+    strategy_name = None
+
+    @abstractmethod
+    def volume(self, x, y, z):
+        """(x0, y0, z0, x1, y1, z1) to read for a start at (x, y, z)."""
+
+    def site(self, x, y, z):
+        """Where the player should stand to work; the start itself by default."""
+        return x, y, z
+
+    @abstractmethod
+    def select(self, blocks):
+        """(y, x, z) mask of the blocks to clear out of the volume."""
+
+    def plan(self, blocks, origin):
+        """
+            ([(setBlocks corners, blocks cleared by it)], {block id: count})
+            for a volume read at origin (its lowest corner).
+        """
+        mineable = (blocks != AIR) & ~np.isin(blocks, list(UNMINEABLE))
+        selected = self.select(blocks) & mineable
+        ids, counts = np.unique(blocks[selected], return_counts=True)
+
+        cuboids = []
+        pending = selected.copy()
+        for box in merge_boxes(selected, allowed=blocks == AIR):
+            y0, x0, z0, y1, x1, z1 = box
+            region = pending[y0:y1 + 1, x0:x1 + 1, z0:z1 + 1]
+            cuboids.append((to_world(box, origin), int(region.sum())))
+            region[...] = False
+        return cuboids, dict(zip(ids.tolist(), counts.tolist()))
+
+
+class VerticalMining(MiningStrategy):
+    """A square shaft straight down from the start to just above bedrock."""
+    strategy_name = "vertical_mining"
+    width = 3
+    floor = 5
+
+    def volume(self, x, y, z):
+        half = self.width // 2
+        return x - half, min(self.floor, y), z - half, x - half + self.width - 1, y, z - half + self.width - 1
+
+    def site(self, x, y, z):
+        # On the surface beside the shaft rather than on top of it
+        return x - self.width // 2 + self.width, y + 1, z
+
+    def select(self, blocks):
+        return np.ones(blocks.shape, dtype=bool)
+
+
+class GridMining(MiningStrategy):
+    """Two-high tunnels every `spacing` blocks along x and z, plus every ore they pass."""
+    strategy_name = "grid_mining"
+    size = 32
+    spacing = 3
+    height = 2
+    ores = tuple(ORES.values())
+
+    def volume(self, x, y, z):
+        return x, y, z, x + self.size - 1, y + self.height - 1, z + self.size - 1
+
+    def select(self, blocks):
+        _, nx, nz = blocks.shape
+        lx = (np.arange(nx) % self.spacing == 0)[:, None]
+        lz = (np.arange(nz) % self.spacing == 0)[None, :]
+        tunnels = np.broadcast_to(lx | lz, blocks.shape)
+        return tunnels | np.isin(blocks, self.ores)
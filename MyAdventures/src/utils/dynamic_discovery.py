@@ -1,20 +1,124 @@
-import pkgutil
+import ast
 import importlib
+import json
+import os
+import pkgutil
+import time
+from functools import cache
 import src.agents
-from src.agents.base_agent import BaseAgent
+from src.command_related.agent_names import AgentNames
+
+"""
+    Agent discovery without importing every agent module up front.
+
+    The manifest (agent name -> module, class) is built by parsing the
+    source of each module in src.agents and cached next to the bytecode,
+    keyed by file modification times. Modules are imported the first time
+    their agent is asked for, and each import is timed for the startup
+    report.
+"""
+
+_MANIFEST_PATH = os.path.join(src.agents.__path__[0], "__pycache__", "agent_manifest.json")
+_import_times = {}
+
+
+def _module_files():
+    files = {}
+    for info in pkgutil.iter_modules(src.agents.__path__):
+        path = os.path.join(info.module_finder.path, f"{info.name}.py")
+        if os.path.exists(path):
+            files[info.name] = path
+    return files
+
+
+def _scan_module(path):
+    """Yield (agent name, class name) for classes declaring `agent_name = AgentNames.X`."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        for stmt in node.body:
+            target = stmt.targets[0] if isinstance(stmt, ast.Assign) else getattr(stmt, "target", None)
+            value = getattr(stmt, "value", None)
+            if (
+                isinstance(target, ast.Name) and target.id == "agent_name"
+                and isinstance(value, ast.Attribute) and isinstance(value.value, ast.Name)
+                and value.value.id == "AgentNames"
+            ):
+                yield AgentNames[value.attr].value, node.name
+
+
+@cache
+def agent_manifest():
+    """{agent name: (module name, class name)} for every agent in src.agents."""
+    files = _module_files()
+    mtimes = {name: os.path.getmtime(path) for name, path in files.items()}
+
+    try:
+        with open(_MANIFEST_PATH, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached["mtimes"] == mtimes:
+            return {agent: tuple(entry) for agent, entry in cached["agents"].items()}
+    except (OSError, ValueError, KeyError):
+        pass
 
+    agents = {}
+    for module_name, path in files.items():
+        for agent, class_name in _scan_module(path):
+            agents[agent] = (f"{src.agents.__name__}.{module_name}", class_name)
 
+    try:
+        os.makedirs(os.path.dirname(_MANIFEST_PATH), exist_ok=True)
+        with open(_MANIFEST_PATH, "w", encoding="utf-8") as f:
+            json.dump({"mtimes": mtimes, "agents": agents}, f)
+    except OSError:
+        pass
+
+    return agents
+
+
+def agent_names():
+    return list(agent_manifest())
+
+
+@cache
+def load_agent(agent_name):
+    """Import the agent's module on first use and return its class."""
+    module_name, class_name = agent_manifest()[agent_name]
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    _import_times.setdefault(module_name, time.perf_counter() - started)
+    return getattr(module, class_name)
+
+
+@cache
 def discover_agents():
-    # Import all modules in agents package
-    for _, module_name, _ in pkgutil.iter_modules(src.agents.__path__):
-        importlib.import_module(f"{src.agents.__name__}.{module_name}")
+    return tuple(load_agent(agent_name) for agent_name in agent_manifest())
+
+
+def import_profile():
+    """[(module, seconds)] for agent modules imported so far, slowest first."""
+    return sorted(_import_times.items(), key=lambda item: item[1], reverse=True)
 
-    # Collect subclasses
-    agents_list = []
-    for cls in BaseAgent.__subclasses__():
-        agents_list.append(cls)
 
-    return agents_list
- 
+def format_import_profile():
+    lines = [f"{'MODULE':<32} {'IMPORT MS':>10}"]
+    for module_name, seconds in import_profile():
+        lines.append(f"{module_name:<32} {seconds * 1000:>10.2f}")
+    return "\n".join(lines)
+
+
+@cache
 def discover_strategies():
-    pass
\ No newline at end of file
+    """{strategy name: class} for every class in src.strategies declaring a `strategy_name`."""
+    import src.strategies
+
+    strategies = {}
+    for info in pkgutil.iter_modules(src.strategies.__path__):
+        module = importlib.import_module(f"{src.strategies.__name__}.{info.name}")
+        for value in vars(module).values():
+            if isinstance(value, type) and getattr(value, "strategy_name", None):
+                strategies[value.strategy_name] = value
+    return strategies
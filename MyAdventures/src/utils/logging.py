@@ -1,6 +1,43 @@
 from src.utils.singleton import Singleton
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import atexit
+import json
 import logging
+import queue
+
+
+class _SamplingFilter(logging.Filter):
+    """Lets through one in every N DEBUG records for sampled (agent, action) pairs."""
+
+    def __init__(self):
+        super().__init__()
+        self.rates = {}
+        self._counts = {}
+
+    def filter(self, record):
+        if record.levelno != logging.DEBUG:
+            return True
+        key = (getattr(record, "agent", None), getattr(record, "action", None))
+        rate = self.rates.get(key)
+        if rate is None:
+            return True
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        return count % rate == 0
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "agent": getattr(record, "agent", None),
+            "action": getattr(record, "action", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
 
 
 class Logger(metaclass=Singleton):
@@ -11,25 +48,43 @@ class Logger(metaclass=Singleton):
         self.logger.propagate = False
 
         formatter = logging.Formatter(
-            "%(asctime)s | %(levelname)s | %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S"  
+            "%(asctime)s | %(levelname)s | [%(agent)s] %(action)s: %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
         )
 
         console = logging.StreamHandler()
         console.setFormatter(formatter)
-        self.logger.addHandler(console)
-        
-        # File handler
-        file_h = RotatingFileHandler("events.log", maxBytes=5_000_000, backupCount=3)
-        file_h.setFormatter(formatter)
-        self.logger.addHandler(file_h)
-
-    
-    def log_debug(self, author, action, debug_message):
-        self.logger.debug(f"[{author}] {action}: {debug_message}")
-
-    def log_error(self, author, action, context_message):
-        self.logger.error(f"[{author}] {action}: {context_message}")
-    
-    def log_info(self, author, action, context_message):
-        self.logger.info(f"[{author}] {action}: {context_message}")
+
+        # File handler, one JSON object per line
+        file_h = RotatingFileHandler("events.jsonl", maxBytes=5_000_000, backupCount=3)
+        file_h.setFormatter(JsonLinesFormatter(datefmt="%Y-%m-%dT%H:%M:%S"))
+
+        # Agents only enqueue records; a background thread does the writing.
+        # QueueHandler formats the message before enqueueing, so arguments
+        # mutated after the call cannot change what gets written
+        self.sampling = _SamplingFilter()
+        records = queue.SimpleQueue()
+        handler = QueueHandler(records)
+        handler.addFilter(self.sampling)
+        self.logger.addHandler(handler)
+
+        self.listener = QueueListener(records, console, file_h, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def sample_debug(self, author, action, every):
+        """Keep only one in `every` debug records logged for this author/action."""
+        self.sampling.rates[(author, action)] = every
+
+    def _log(self, level, author, action, message, args):
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, message, *args, extra={"agent": author, "action": action})
+
+    def log_debug(self, author, action, debug_message, *args):
+        self._log(logging.DEBUG, author, action, debug_message, args)
+
+    def log_error(self, author, action, context_message, *args):
+        self._log(logging.ERROR, author, action, context_message, args)
+
+    def log_info(self, author, action, context_message, *args):
+        self._log(logging.INFO, author, action, context_message, args)
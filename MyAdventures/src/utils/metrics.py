@@ -0,0 +1,210 @@
+import asyncio
+import inspect
+import json
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from src.utils.singleton import Singleton
+
+"""
+    Counters, gauges and latency histograms for the hot paths. Everything is
+    a no-op until Metrics().enable() is called, so instrumentation can stay
+    in place permanently. Export is Prometheus text over a tiny HTTP server
+    or a periodic JSON dump. Worker processes report their own series with
+    their status; the parent exports them with a "process" label.
+"""
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _label_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+
+class Metrics(metaclass=Singleton):
+
+    def __init__(self):
+        self.enabled = False
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        # Worker name -> the (counters, gauges, histograms) it last reported
+        self.remote = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def inc(self, name, labels=(), amount=1):
+        if self.enabled:
+            key = (name, labels)
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def gauge_add(self, name, delta, labels=()):
+        key = (name, labels)
+        self.gauges[key] = self.gauges.get(key, 0) + delta
+
+    def gauge_set(self, name, value, labels=()):
+        self.gauges[(name, labels)] = value
+
+    def observe(self, name, value, labels=()):
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    @contextmanager
+    def _timing(self, name, labels):
+        self.gauge_add(f"{name}_in_flight", 1, labels)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - started, labels)
+            self.gauge_add(f"{name}_in_flight", -1, labels)
+
+    def timed(self, name, labels=()):
+        """Context manager recording latency and in-flight count for `name`."""
+        if not self.enabled:
+            return nullcontext()
+        return self._timing(name, labels)
+
+    def state(self):
+        """Every series as plain picklable data, for a worker to report to the parent."""
+        histograms = {key: (list(h.counts), h.sum, h.count) for key, h in self.histograms.items()}
+        return dict(self.counters), dict(self.gauges), histograms
+
+    def merge(self, process, state):
+        """Replace what worker `process` last reported with its new state()."""
+        self.remote[process] = state
+
+    def _series(self):
+        counters, gauges, histograms = dict(self.counters), dict(self.gauges), dict(self.histograms)
+        for process, (remote_counters, remote_gauges, remote_histograms) in self.remote.items():
+            extra = (("process", process),)
+            counters.update(((name, labels + extra), value) for (name, labels), value in remote_counters.items())
+            gauges.update(((name, labels + extra), value) for (name, labels), value in remote_gauges.items())
+            for (name, labels), (counts, total, count) in remote_histograms.items():
+                histogram = histograms[(name, labels + extra)] = Histogram()
+                histogram.counts, histogram.sum, histogram.count = counts, total, count
+        return counters, gauges, histograms
+
+    def render_prometheus(self):
+        counters, gauges, histograms = self._series()
+        lines = []
+        for (name, labels), value in sorted(counters.items()):
+            lines.append(f"{name}_total{_label_text(labels)} {value}")
+        for (name, labels), value in sorted(gauges.items()):
+            lines.append(f"{name}{_label_text(labels)} {value}")
+        for (name, labels), histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_label_text(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(labels)} {histogram.sum}")
+            lines.append(f"{name}_count{_label_text(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        def key_text(name, labels):
+            return name + _label_text(labels)
+
+        counters, gauges, histograms = self._series()
+        return {
+            "counters": {key_text(*key): value for key, value in counters.items()},
+            "gauges": {key_text(*key): value for key, value in gauges.items()},
+            "histograms": {
+                key_text(*key): {"count": h.count, "sum": h.sum, "buckets": dict(zip(map(str, BUCKETS + ("+Inf",)), h.counts))}
+                for key, h in histograms.items()
+            },
+        }
+
+    async def serve(self, host="127.0.0.1", port=9108):
+        """HTTP endpoint: /metrics (Prometheus text), /enable and /disable."""
+        async def handle(reader, writer):
+            request = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+            path = request.split()[1].decode() if len(request.split()) > 1 else "/"
+
+            match path:
+                case "/enable":
+                    self.enable()
+                    body = "enabled\n"
+                case "/disable":
+                    self.disable()
+                    body = "disabled\n"
+                case _:
+                    body = self.render_prometheus()
+
+            payload = body.encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                + f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode()
+                + payload
+            )
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def dump_json(self, path, interval=10.0):
+        while True:
+            await asyncio.sleep(interval)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, indent=2)
+
+
+def instrumented(name, labels=()):
+    """Decorator timing a sync or async callable under `name` while metrics are enabled."""
+    metrics = Metrics()
+
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not metrics.enabled:
+                    return await fn(*args, **kwargs)
+                with metrics._timing(name, labels):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return fn(*args, **kwargs)
+            with metrics._timing(name, labels):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+def instrument_connection(conn):
+    """Time every send/receive on an mcpi Connection instance."""
+    conn.send = instrumented("mcpi_send")(conn.send)
+    conn.receive = instrumented("mcpi_receive")(conn.receive)
+    return conn
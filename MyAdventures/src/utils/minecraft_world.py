@@ -1,4 +1,6 @@
 from src.utils.singleton import Singleton
+from src.utils.metrics import instrument_connection
+from src.utils.protocol_recorder import ProtocolRecorder
 from mcpi.minecraft import Minecraft
 import mcpi.block as block
 
@@ -7,28 +9,47 @@ class MinecraftWorld(metaclass=Singleton):
     
     def __init__ (self):
         self.mc = Minecraft.create()
+        instrument_connection(self.mc.conn)
     
+    def start_recording (self, path):
+        """Capture all protocol traffic to `path`; close() the returned recorder to stop."""
+        return ProtocolRecorder(self.mc.conn, path)
+
     def get_player_position (self):
         return self.mc.player.getTilePos()
     
+    def set_player_tile_position (self, x, y, z):
+        self.mc.player.setTilePos(x, y, z)
+
+    def set_entity_tile_position (self, entity_id, x, y, z):
+        self.mc.entity.setTilePos(entity_id, x, y, z)
+
     def get_block_altitude (self, x, z):
         return self.mc.getHeight(x, z)
     
     def block_id (self, x, y, z):
         return self.mc.getBlock(x, y, z)
     
+    def get_blocks (self, x0, y0, z0, x1, y1, z1):
+        return self.mc.getBlocks(x0, y0, z0, x1, y1, z1)
+
     def set_block (self, x, y, z, block_id):
         self.mc.setBlock(x, y, z, block_id)
     
+    def set_blocks (self, x0, y0, z0, x1, y1, z1, block_id):
+        self.mc.setBlocks(x0, y0, z0, x1, y1, z1, block_id)
+
     def is_block_wanted (self, x, y, z, wanted_block_id):
         return self.mc.getBlock(x, y, z) == wanted_block_id
 
     def post_message_chat (self, message):
         self.mc.postToChat(message)
 
-    def poll_chat_messages (self):
-        posts = []
-        for post in self.mc.events.pollChatPosts(): 
-            if post.message:
-                posts.append(post.message)
-        return posts
\ No newline at end of file
+    def poll_block_hits (self):
+        return self.mc.events.pollBlockHits()
+
+    def poll_chat_posts (self, prefixes=None):
+        return self.mc.events.pollChatPosts(prefixes)
+
+    def poll_chat_messages (self, prefixes=None):
+        return [message for _, message in self.mc.events.iterChatPosts(prefixes) if message]
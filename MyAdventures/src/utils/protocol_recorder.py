@@ -0,0 +1,196 @@
+import argparse
+import gzip
+import socketserver
+import struct
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from mcpi.connection import Connection, RequestError
+
+"""
+    Records the raw RaspberryJuice protocol traffic of an mcpi Connection
+    and replays it.
+
+    Log format (gzip-compressed): b"MCRT" + version byte, then records of
+    kind (uint8), seconds since recording started (float64), length (uint32)
+    and the payload bytes. SEND payloads are the exact line written to the
+    socket, RECEIVE payloads the line read back, FAIL marks a "Fail" reply.
+
+    Replay:  python -m src.utils.protocol_recorder session.mcrt --speed 4
+             python -m src.utils.protocol_recorder session.mcrt --fake
+"""
+
+MAGIC = b"MCRT\x01"
+_RECORD = struct.Struct("<BdI")
+SEND, RECEIVE, FAIL = 0, 1, 2
+
+
+class ProtocolRecorder:
+    def __init__(self, conn, path):
+        self.conn = conn
+        self.path = path
+        self._file = gzip.open(path, "wb")
+        self._file.write(MAGIC)
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+        self._send = conn._send
+        self._receive = conn.receive
+        conn._send = self._recording_send
+        conn.receive = self._recording_receive
+
+    def _write(self, kind, payload):
+        with self._lock:
+            if self._file is not None:
+                self._file.write(_RECORD.pack(kind, time.perf_counter() - self._started, len(payload)))
+                self._file.write(payload)
+
+    def _recording_send(self, s):
+        self._write(SEND, s)
+        return self._send(s)
+
+    def _recording_receive(self):
+        try:
+            line = self._receive()
+        except RequestError:
+            self._write(FAIL, Connection.RequestFailed.encode())
+            raise
+        self._write(RECEIVE, line.encode("utf-8"))
+        return line
+
+    def close(self):
+        self.conn._send = self._send
+        self.conn.receive = self._receive
+        with self._lock:
+            self._file.close()
+            self._file = None
+
+
+def read_log(path):
+    """Yield (kind, seconds, payload) records from a recording."""
+    with gzip.open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a protocol recording")
+        while True:
+            header = f.read(_RECORD.size)
+            if len(header) < _RECORD.size:
+                return
+            kind, seconds, size = _RECORD.unpack(header)
+            yield kind, seconds, f.read(size)
+
+
+def _exchanges(path):
+    """Pair each sent line with its reply (None for commands without one)."""
+    pending = None
+    for kind, seconds, payload in read_log(path):
+        if kind == SEND:
+            if pending is not None:
+                yield pending + (None,)
+            pending = (seconds, payload)
+        elif pending is not None:
+            yield pending + ((kind, payload),)
+            pending = None
+    if pending is not None:
+        yield pending + (None,)
+
+
+@dataclass
+class ReplayReport:
+    commands: int = 0
+    queries: int = 0
+    mismatches: int = 0
+    elapsed: float = 0.0
+    latencies: list = field(default_factory=list)
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0.0
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0
+        rate = self.commands / self.elapsed if self.elapsed else 0.0
+        return (
+            f"{self.commands} commands ({self.queries} with replies) in {self.elapsed:.2f}s "
+            f"= {rate:.0f} cmd/s, reply p50 {p50:.2f}ms p99 {p99:.2f}ms, {self.mismatches} mismatched replies"
+        )
+
+
+def replay(path, conn, speed=1.0):
+    """
+        Re-drive a recording against `conn`. speed=1 keeps the original
+        pacing, speed=4 runs four times faster, speed=0 sends back to back.
+    """
+    report = ReplayReport()
+    started = time.perf_counter()
+
+    for seconds, line, reply in _exchanges(path):
+        if speed:
+            delay = seconds / speed - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+
+        conn._send(line)
+        report.commands += 1
+        if reply is None:
+            continue
+
+        report.queries += 1
+        sent = time.perf_counter()
+        try:
+            got = conn.receive().encode("utf-8")
+        except RequestError:
+            got = Connection.RequestFailed.encode()
+        report.latencies.append(time.perf_counter() - sent)
+        if got != reply[1]:
+            report.mismatches += 1
+
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+class FakeServer(socketserver.ThreadingTCPServer):
+    """Answers each command with the reply recorded for it, in recorded order."""
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, path, address=("127.0.0.1", 0)):
+        self.replies = defaultdict(deque)
+        for _, line, reply in _exchanges(path):
+            if reply is not None:
+                self.replies[line].append(reply[1])
+        super().__init__(address, _FakeHandler)
+
+
+class _FakeHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            replies = self.server.replies.get(line)
+            if replies:
+                self.wfile.write(replies.popleft() + b"\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded mcpi session")
+    parser.add_argument("path")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=4711)
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = original pacing, 0 = as fast as possible")
+    parser.add_argument("--fake", action="store_true", help="replay against a local server serving the recorded replies")
+    args = parser.parse_args()
+
+    server = None
+    if args.fake:
+        server = FakeServer(args.path)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        args.host, args.port = server.server_address
+
+    conn = Connection(args.host, args.port)
+    try:
+        print(replay(args.path, conn, args.speed).summary())
+    finally:
+        conn.socket.close()
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import asyncio
+import time
+
+
+class RateLimiter:
+    """Token bucket: `rate` operations per second with bursts of up to `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self.waited = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens=1):
+        self._refill()
+        while self._tokens < tokens:
+            delay = (tokens - self._tokens) / self.rate
+            self.waited += delay
+            await asyncio.sleep(delay)
+            self._refill()
+        self._tokens -= tokens
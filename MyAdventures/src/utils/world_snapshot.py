@@ -0,0 +1,158 @@
+import struct
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+"""
+    Shared-memory chunk snapshots. The supervisor publishes the chunks of
+    its WorldModel; agent processes attach to the same segments by name
+    and read the block ids without copying.
+
+    Segment layout: header (version:uint64, updated_at:float64) followed by
+    CHUNK_SIZE * CHUNK_SIZE * height uint16 block ids in getBlocks order
+    (y, then x, then z). The version is odd while a write is in progress:
+    readers take the version before and after reading and retry if it
+    moved, and give up if a write never finishes (the writer died).
+"""
+
+CHUNK_SIZE = 16
+# Seconds a reader waits on a write in progress before giving up
+SPIN_TIMEOUT = 1.0
+_HEADER = struct.Struct("<Qd")
+
+
+def segment_name(prefix, cx, cz):
+    return f"{prefix}_{cx}_{cz}".replace("-", "m")
+
+
+def attach(name):
+    """Map an existing segment without taking part in its cleanup."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no `track`; readers then rely on the writer to unlink
+        return shared_memory.SharedMemory(name=name)
+
+
+class WorldSnapshot:
+    """Writer side: owns the segments and keeps them up to date."""
+
+    def __init__(self, prefix="mcworld", y_min=0, height=128):
+        self.prefix = prefix
+        self.y_min = y_min
+        self.height = height
+        self.voxels = CHUNK_SIZE * CHUNK_SIZE * height
+        self._segments = {}
+
+    def publish_chunk(self, cx, cz, block_ids):
+        values = np.asarray(block_ids if isinstance(block_ids, np.ndarray) else list(block_ids), dtype=np.uint16).ravel()
+        if len(values) != self.voxels:
+            raise ValueError(f"chunk {cx},{cz}: expected {self.voxels} blocks, got {len(values)}")
+
+        segment = self._segments.get((cx, cz))
+        if segment is None:
+            segment = shared_memory.SharedMemory(
+                name=segment_name(self.prefix, cx, cz),
+                create=True,
+                size=_HEADER.size + self.voxels * 2
+            )
+            self._segments[(cx, cz)] = segment
+
+        version, _ = _HEADER.unpack_from(segment.buf)
+        _HEADER.pack_into(segment.buf, 0, version + 1, time.time())
+        np.ndarray(self.voxels, dtype=np.uint16, buffer=segment.buf, offset=_HEADER.size)[:] = values
+        _HEADER.pack_into(segment.buf, 0, version + 2, time.time())
+        return version + 2
+
+    def close(self):
+        for segment in self._segments.values():
+            segment.close()
+            segment.unlink()
+        self._segments.clear()
+
+
+class ChunkView:
+    """Read-only view of one published chunk."""
+
+    def __init__(self, segment, y_min, height):
+        self._segment = segment
+        self.y_min = y_min
+        self.height = height
+        voxels = CHUNK_SIZE * CHUNK_SIZE * height
+        self.blocks = segment.buf[_HEADER.size:_HEADER.size + voxels * 2].cast("H").toreadonly()
+        self.version = self.current_version()
+
+    def current_version(self):
+        """The version once no write is in progress."""
+        deadline = time.monotonic() + SPIN_TIMEOUT
+        while True:
+            version, _ = _HEADER.unpack_from(self._segment.buf)
+            if version % 2 == 0:
+                return version
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"snapshot segment {self._segment.name} stuck mid-write at version {version}")
+
+    @property
+    def stale(self):
+        return _HEADER.unpack_from(self._segment.buf)[0] != self.version
+
+    def refresh(self):
+        self.version = self.current_version()
+        return self.version
+
+    def _consistent(self, read):
+        """read() under the seqlock: retried until no write overlapped it."""
+        deadline = time.monotonic() + SPIN_TIMEOUT
+        while True:
+            version = self.current_version()
+            value = read()
+            if _HEADER.unpack_from(self._segment.buf)[0] == version:
+                self.version = version
+                return value
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"snapshot segment {self._segment.name} kept changing while read")
+
+    def get(self, lx, y, lz):
+        index = ((y - self.y_min) * CHUNK_SIZE + lx) * CHUNK_SIZE + lz
+        return self._consistent(lambda: self.blocks[index])
+
+    def read(self):
+        """A private copy of the whole chunk as a (height, 16, 16) uint16 array."""
+        return self._consistent(
+            lambda: np.frombuffer(self.blocks, dtype=np.uint16).reshape(self.height, CHUNK_SIZE, CHUNK_SIZE).copy()
+        )
+
+    def close(self):
+        self.blocks.release()
+        self._segment.close()
+
+
+class SnapshotReader:
+    """Reader side: attaches to chunks published by a WorldSnapshot."""
+
+    def __init__(self, prefix="mcworld", y_min=0, height=128):
+        self.prefix = prefix
+        self.y_min = y_min
+        self.height = height
+        self._views = {}
+
+    def chunk(self, cx, cz):
+        view = self._views.get((cx, cz))
+        if view is None:
+            try:
+                segment = attach(segment_name(self.prefix, cx, cz))
+            except FileNotFoundError:
+                return None
+            view = self._views[(cx, cz)] = ChunkView(segment, self.y_min, self.height)
+        return view
+
+    def get_block(self, x, y, z):
+        view = self.chunk(x // CHUNK_SIZE, z // CHUNK_SIZE)
+        if view is None:
+            return None
+        return view.get(x % CHUNK_SIZE, y, z % CHUNK_SIZE)
+
+    def close(self):
+        for view in self._views.values():
+            view.close()
+        self._views.clear()
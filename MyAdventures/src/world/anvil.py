@@ -0,0 +1,259 @@
+import gzip
+import mmap
+import os
+import re
+import struct
+import time
+import zlib
+import numpy as np
+from src.utils.logging import Logger
+from src.world.chunk_store import SECTION
+
+"""
+    Offline reader for the server's Anvil region files (r.<rx>.<rz>.mca).
+
+    A region file starts with a table of 1024 chunk locations (offset and
+    length in 4 KiB sectors); each chunk is a length, a compression type and
+    a compressed NBT compound. Files are memory-mapped and a chunk is only
+    decompressed and parsed when it is read.
+
+    The server runs 1.12, whose sections store one byte per block in
+    Blocks, plus an optional Add nibble for ids above 255, in y, z, x order.
+    Sections are returned as (y, x, z) uint16 arrays of block ids, the
+    layout world.getBlocks and the ChunkStore use. Like getBlocks, the Data
+    nibble (block variant) is not kept.
+"""
+
+REGION_CHUNKS = 32
+COLUMN_HEIGHT = 256
+# Region folders of the server's dimensions, relative to the server directory
+DIMENSIONS = {
+    "overworld": os.path.join("world", "region"),
+    "nether": os.path.join("world_nether", "DIM-1", "region"),
+    "the_end": os.path.join("world_the_end", "DIM1", "region"),
+}
+
+_SECTOR = 4096
+_REGION_NAME = re.compile(r"r\.(-?\d+)\.(-?\d+)\.mca$")
+
+_BYTE = struct.Struct(">b")
+_SHORT = struct.Struct(">h")
+_USHORT = struct.Struct(">H")
+_INT = struct.Struct(">i")
+_LONG = struct.Struct(">q")
+_FLOAT = struct.Struct(">f")
+_DOUBLE = struct.Struct(">d")
+
+
+def _scalar(fmt):
+    def read(data, pos):
+        return fmt.unpack_from(data, pos)[0], pos + fmt.size
+    return read
+
+
+def _array(dtype):
+    def read(data, pos):
+        length = _INT.unpack_from(data, pos)[0]
+        pos += 4
+        end = pos + length * dtype.itemsize
+        return np.frombuffer(data, dtype=dtype, count=length, offset=pos), end
+    return read
+
+
+def _string(data, pos):
+    length = _USHORT.unpack_from(data, pos)[0]
+    pos += 2
+    return bytes(data[pos:pos + length]).decode("utf-8", "replace"), pos + length
+
+
+def _list(data, pos):
+    tag, length = data[pos], _INT.unpack_from(data, pos + 1)[0]
+    pos += 5
+    read = _READERS[tag] if length > 0 else None
+    items = []
+    for _ in range(length):
+        item, pos = read(data, pos)
+        items.append(item)
+    return items, pos
+
+
+def _compound(data, pos):
+    values = {}
+    while True:
+        tag = data[pos]
+        pos += 1
+        if tag == 0:
+            return values, pos
+        name, pos = _string(data, pos)
+        values[name], pos = _READERS[tag](data, pos)
+
+
+# NBT tag id -> reader(data, pos) returning (value, position after it)
+_READERS = {
+    1: _scalar(_BYTE),
+    2: _scalar(_SHORT),
+    3: _scalar(_INT),
+    4: _scalar(_LONG),
+    5: _scalar(_FLOAT),
+    6: _scalar(_DOUBLE),
+    7: _array(np.dtype(np.uint8)),
+    8: _string,
+    9: _list,
+    10: _compound,
+    11: _array(np.dtype(">i4")),
+    12: _array(np.dtype(">i8")),
+}
+
+
+def parse_nbt(data):
+    """Root compound of an uncompressed NBT payload; arrays are NumPy views into `data`."""
+    if data[0] != 10:
+        raise ValueError(f"NBT root must be a compound, got tag {data[0]}")
+    _, pos = _string(data, 1)
+    return _compound(data, pos)[0]
+
+
+def _nibbles(packed):
+    """4096 4-bit values from 2048 bytes, low nibble first."""
+    values = np.empty(packed.size * 2, dtype=np.uint8)
+    values[0::2] = packed & 0x0F
+    values[1::2] = packed >> 4
+    return values
+
+
+def decode_sections(level):
+    """{section y: (y, x, z) uint16 block ids} of a chunk's Level compound."""
+    sections = {}
+    for section in level.get("Sections", ()):
+        blocks = section.get("Blocks")
+        if blocks is None:
+            continue
+        ids = blocks.astype(np.uint16)
+        add = section.get("Add")
+        if add is not None:
+            ids |= _nibbles(add).astype(np.uint16) << 8
+        # Stored y, z, x
+        sections[section["Y"]] = ids.reshape(SECTION, SECTION, SECTION).transpose(0, 2, 1)
+    return sections
+
+
+def decode_column(level, height=COLUMN_HEIGHT, out=None):
+    """
+        The whole chunk column as a (height, 16, 16) array in (y, x, z)
+        order, written into `out` if given. Anvil omits sections that are
+        all air, so they come back as air rather than unknown.
+    """
+    if out is None:
+        out = np.zeros((height, SECTION, SECTION), dtype=np.uint16)
+    else:
+        out[...] = 0
+    for sy, ids in decode_sections(level).items():
+        if 0 <= sy * SECTION < len(out):
+            out[sy * SECTION:(sy + 1) * SECTION] = ids
+    return out
+
+
+class RegionFile:
+
+    def __init__(self, path):
+        self.path = path
+        match = _REGION_NAME.search(os.path.basename(path))
+        if match is None:
+            raise ValueError(f"not a region file name: {path}")
+        self.rx, self.rz = int(match[1]), int(match[2])
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # Servers create empty region files before writing any chunk
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size >= 2 * _SECTOR else None
+        self._locations = (
+            np.frombuffer(self._map, dtype=">u4", count=REGION_CHUNKS * REGION_CHUNKS)
+            if self._map is not None else np.zeros(0, dtype=">u4")
+        )
+
+    def chunks(self):
+        """World (cx, cz) of every chunk stored in the file."""
+        for index in np.flatnonzero(self._locations).tolist():
+            lz, lx = divmod(index, REGION_CHUNKS)
+            yield self.rx * REGION_CHUNKS + lx, self.rz * REGION_CHUNKS + lz
+
+    def __len__(self):
+        return int(np.count_nonzero(self._locations))
+
+    def read(self, cx, cz):
+        """Decompressed NBT of chunk (cx, cz), or None if the file does not hold it."""
+        if self._map is None:
+            return None
+        location = int(self._locations[(cz % REGION_CHUNKS) * REGION_CHUNKS + cx % REGION_CHUNKS])
+        if not location:
+            return None
+        offset = (location >> 8) * _SECTOR
+        length, compression = struct.unpack_from(">IB", self._map, offset)
+        payload = self._map[offset + 5:offset + 4 + length]
+        match compression:
+            case 1:
+                return gzip.decompress(payload)
+            case 2:
+                return zlib.decompress(payload)
+            case 3:
+                return payload
+        raise ValueError(f"{self.path}: chunk {cx},{cz} uses unknown compression {compression}")
+
+    def level(self, cx, cz):
+        data = self.read(cx, cz)
+        return parse_nbt(data)["Level"] if data is not None else None
+
+    def close(self):
+        self._locations = np.zeros(0, dtype=">u4")
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def region_paths(region_dir):
+    if not os.path.isdir(region_dir):
+        return []
+    return sorted(
+        os.path.join(region_dir, name) for name in os.listdir(region_dir) if _REGION_NAME.search(name)
+    )
+
+
+def iter_columns(region_dir, height=COLUMN_HEIGHT):
+    """(cx, cz, column) for every chunk of every region file in `region_dir`."""
+    for path in region_paths(region_dir):
+        with RegionFile(path) as region:
+            for cx, cz in region.chunks():
+                yield cx, cz, decode_column(region.level(cx, cz), height)
+
+
+def column_cuboid(cx, cz, column):
+    """WorldModel.ingest_many entry for a decoded chunk column."""
+    x0, z0 = cx * SECTION, cz * SECTION
+    return x0, 0, z0, x0 + SECTION - 1, len(column) - 1, z0 + SECTION - 1, column
+
+
+def import_region_dir(world, region_dir, height=COLUMN_HEIGHT, batch=32):
+    """Load every chunk under `region_dir` into `world` (a WorldModel); returns the chunk count."""
+    started = time.perf_counter()
+    count = 0
+    pending = []
+    for cx, cz, column in iter_columns(region_dir, height):
+        pending.append(column_cuboid(cx, cz, column))
+        if len(pending) == batch:
+            world.ingest_many(pending, imported=True)
+            count += len(pending)
+            pending = []
+    world.ingest_many(pending, imported=True)
+    count += len(pending)
+    elapsed = time.perf_counter() - started
+    Logger().log_info(
+        "WorldImport", "import", "%d chunks from %s in %.2fs (%.0f chunks/s)",
+        count, region_dir, elapsed, count / elapsed if elapsed else 0.0
+    )
+    return count
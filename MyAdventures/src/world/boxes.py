@@ -0,0 +1,44 @@
+import numpy as np
+
+"""
+    Turning a 3D mask of blocks to change into a handful of setBlocks
+    cuboids instead of one setBlock per block.
+"""
+
+
+def merge_boxes(required, allowed=None):
+    """
+        Cover every True cell of the (y, x, z) mask `required` with
+        axis-aligned boxes, growing each greedily along z, then x, then y.
+        Boxes may also spill over cells where `allowed` is True (e.g. blocks
+        that already have the target value). Returns inclusive index boxes
+        (y0, x0, z0, y1, x1, z1), bottom layer first.
+    """
+    required = np.asarray(required, dtype=bool)
+    allowed = required if allowed is None else (np.asarray(allowed, dtype=bool) | required)
+    todo = required.copy()
+    ny, nx, nz = required.shape
+
+    boxes = []
+    for y, x, z in zip(*np.nonzero(required)):
+        if not todo[y, x, z]:
+            continue
+        z1 = z
+        while z1 + 1 < nz and allowed[y, x, z1 + 1]:
+            z1 += 1
+        x1 = x
+        while x1 + 1 < nx and allowed[y, x1 + 1, z:z1 + 1].all():
+            x1 += 1
+        y1 = y
+        while y1 + 1 < ny and allowed[y1 + 1, x:x1 + 1, z:z1 + 1].all():
+            y1 += 1
+        todo[y:y1 + 1, x:x1 + 1, z:z1 + 1] = False
+        boxes.append((int(y), int(x), int(z), int(y1), int(x1), int(z1)))
+    return boxes
+
+
+def to_world(box, origin):
+    """Index box -> world setBlocks corners (x0, y0, z0, x1, y1, z1) for a volume starting at origin."""
+    y0, x0, z0, y1, x1, z1 = box
+    ox, oy, oz = origin
+    return ox + x0, oy + y0, oz + z0, ox + x1, oy + y1, oz + z1
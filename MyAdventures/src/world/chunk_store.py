@@ -0,0 +1,233 @@
+from array import array
+import numpy as np
+
+"""
+    Sparse block storage for surveyed terrain.
+
+    Chunks are hashed by (cx, cz) and hold the 16x16x16 sections that were
+    actually read, keyed by section y. Like Minecraft's own chunk format, a
+    section stores a palette of the block ids it contains and one bit-packed
+    palette index per block: a section of solid stone or air is just a
+    one-entry palette, a typical underground section packs into 4 bits per
+    block (2 KiB) instead of a Python int per voxel.
+
+    Blocks inside a section are laid out y, then x, then z, the order
+    world.getBlocks returns them.
+"""
+
+SECTION = 16
+SECTION_VOLUME = SECTION ** 3
+AIR = 0
+# Value read_cuboid() reports for blocks that were never surveyed
+MISSING = 0xFFFF
+
+
+def section_key(x, y, z):
+    return x >> 4, y >> 4, z >> 4
+
+
+def section_index(lx, ly, lz):
+    return (ly * SECTION + lx) * SECTION + lz
+
+
+def _bits_for(palette_size):
+    # Minecraft uses at least 4 bits once a section holds more than one block type
+    return 0 if palette_size <= 1 else max(4, (palette_size - 1).bit_length())
+
+
+class Section:
+    __slots__ = ("palette", "bits", "data", "counts")
+
+    def __init__(self, blocks):
+        ids = np.asarray(blocks, dtype=np.uint16).reshape(-1)
+        if ids.size != SECTION_VOLUME:
+            raise ValueError(f"a section holds {SECTION_VOLUME} blocks, got {ids.size}")
+        first = int(ids[0])
+        if (ids == first).all():
+            # Solid rock or open air, the common case: skip the sort
+            self.palette = array("H", (first,))
+            self.counts = {first: SECTION_VOLUME}
+            self._pack(None)
+            return
+        palette, indices, counts = np.unique(ids, return_inverse=True, return_counts=True)
+        self.palette = array("H", palette.tolist())
+        self.counts = dict(zip(palette.tolist(), counts.tolist()))
+        self._pack(indices)
+
+    @classmethod
+    def from_packed(cls, palette, bits, data, counts):
+        """
+            A section from another one's fields, e.g. built in a worker
+            process: `palette` and `data` are the bytes of its arrays.
+        """
+        section = cls.__new__(cls)
+        section.palette = array("H")
+        section.palette.frombytes(palette)
+        section.bits = bits
+        section.data = array("Q")
+        section.data.frombytes(data)
+        section.counts = counts
+        return section
+
+    def _pack(self, indices):
+        self.bits = _bits_for(len(self.palette))
+        self.data = array("Q")
+        if not self.bits:
+            return
+        # Entries never straddle two words, as in the 1.16+ format
+        per_word = 64 // self.bits
+        words = -(-SECTION_VOLUME // per_word)
+        padded = np.zeros(words * per_word, dtype=np.uint64)
+        padded[:SECTION_VOLUME] = indices
+        shifts = np.arange(per_word, dtype=np.uint64) * np.uint64(self.bits)
+        self.data.frombytes(np.bitwise_or.reduce(padded.reshape(words, per_word) << shifts, axis=1).tobytes())
+
+    def indices(self):
+        """Palette index of every block as a flat uint16 array."""
+        if not self.bits:
+            return np.zeros(SECTION_VOLUME, dtype=np.uint16)
+        per_word = 64 // self.bits
+        shifts = np.arange(per_word, dtype=np.uint64) * np.uint64(self.bits)
+        words = np.frombuffer(self.data, dtype=np.uint64)
+        unpacked = (words[:, None] >> shifts) & np.uint64((1 << self.bits) - 1)
+        return unpacked.reshape(-1)[:SECTION_VOLUME].astype(np.uint16)
+
+    def to_array(self):
+        """Block ids as a (y, x, z) uint16 array."""
+        return np.asarray(self.palette, dtype=np.uint16)[self.indices()].reshape(SECTION, SECTION, SECTION)
+
+    def get(self, index):
+        if not self.bits:
+            return self.palette[0]
+        index, per_word = int(index), 64 // self.bits
+        word = self.data[index // per_word]
+        return self.palette[(word >> (index % per_word * self.bits)) & ((1 << self.bits) - 1)]
+
+    def set(self, index, block_id):
+        previous = self.get(index)
+        if previous == block_id:
+            return
+        try:
+            value = self.palette.index(block_id)
+        except ValueError:
+            # New block type: rebuild, which also drops palette entries no longer used
+            blocks = self.to_array().reshape(-1)
+            blocks[index] = block_id
+            self.__init__(blocks)
+            return
+
+        self.counts[previous] -= 1
+        if not self.counts[previous]:
+            del self.counts[previous]
+        self.counts[block_id] = self.counts.get(block_id, 0) + 1
+
+        index, per_word = int(index), 64 // self.bits
+        shift = index % per_word * self.bits
+        word = self.data[index // per_word]
+        self.data[index // per_word] = word - (((word >> shift) & ((1 << self.bits) - 1)) << shift) + (value << shift)
+
+    def positions(self, block_id):
+        """Flat section indices holding `block_id`."""
+        if block_id not in self.counts:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.indices() == self.palette.index(block_id))
+
+    def memory_bytes(self):
+        return self.palette.itemsize * len(self.palette) + self.data.itemsize * len(self.data)
+
+
+class ChunkStore:
+
+    def __init__(self):
+        # (cx, cz) -> {section y: Section}
+        self.chunks = {}
+
+    def section(self, key):
+        sections = self.chunks.get((key[0], key[2]))
+        return sections.get(key[1]) if sections is not None else None
+
+    def sections(self):
+        """Yield ((sx, sy, sz), Section) for every stored section."""
+        for (cx, cz), sections in self.chunks.items():
+            for sy, section in sections.items():
+                yield (cx, sy, cz), section
+
+    def put_section(self, key, section):
+        self.chunks.setdefault((key[0], key[2]), {})[key[1]] = section
+
+    def get_block(self, x, y, z):
+        """Block id at (x, y, z), or None if that part of the world was never read."""
+        section = self.section(section_key(x, y, z))
+        if section is None:
+            return None
+        return section.get(section_index(x & 15, y & 15, z & 15))
+
+    def set_block(self, x, y, z, block_id):
+        key = section_key(x, y, z)
+        section = self.section(key)
+        if section is None:
+            section = Section(np.full(SECTION_VOLUME, AIR, dtype=np.uint16))
+            self.put_section(key, section)
+        section.set(section_index(x & 15, y & 15, z & 15), block_id)
+
+    def load_cuboid(self, x0, y0, z0, x1, y1, z1, ids):
+        """
+            Store the result of world.getBlocks(x0, y0, z0, x1, y1, z1). The
+            cuboid has to cover whole sections; returns the keys written.
+        """
+        x0, x1 = sorted((x0, x1))
+        y0, y1 = sorted((y0, y1))
+        z0, z1 = sorted((z0, z1))
+        if any(low & 15 or (high + 1) & 15 for low, high in ((x0, x1), (y0, y1), (z0, z1))):
+            raise ValueError("cuboid is not aligned to 16-block sections")
+
+        shape = (y1 - y0 + 1, x1 - x0 + 1, z1 - z0 + 1)
+        blocks = np.asarray(ids if isinstance(ids, np.ndarray) else list(ids), dtype=np.uint16)
+        if blocks.size != shape[0] * shape[1] * shape[2]:
+            raise ValueError(f"expected {shape[0] * shape[1] * shape[2]} block ids, got {blocks.size}")
+        blocks = blocks.reshape(shape)
+
+        keys = []
+        for iy in range(0, shape[0], SECTION):
+            for ix in range(0, shape[1], SECTION):
+                for iz in range(0, shape[2], SECTION):
+                    key = ((x0 + ix) >> 4, (y0 + iy) >> 4, (z0 + iz) >> 4)
+                    self.put_section(key, Section(blocks[iy:iy + SECTION, ix:ix + SECTION, iz:iz + SECTION]))
+                    keys.append(key)
+        return keys
+
+    def section_array(self, sx, sy, sz):
+        """A stored section as a (y, x, z) uint16 array, or None."""
+        section = self.section((sx, sy, sz))
+        return section.to_array() if section is not None else None
+
+    def read_cuboid(self, x0, y0, z0, x1, y1, z1):
+        """Blocks of any cuboid as a (y, x, z) uint16 array; unsurveyed blocks read as MISSING."""
+        x0, x1 = sorted((x0, x1))
+        y0, y1 = sorted((y0, y1))
+        z0, z1 = sorted((z0, z1))
+        out = np.full((y1 - y0 + 1, x1 - x0 + 1, z1 - z0 + 1), MISSING, dtype=np.uint16)
+        for sy in range(y0 >> 4, (y1 >> 4) + 1):
+            for sx in range(x0 >> 4, (x1 >> 4) + 1):
+                for sz in range(z0 >> 4, (z1 >> 4) + 1):
+                    section = self.section((sx, sy, sz))
+                    if section is None:
+                        continue
+                    # Overlap of the cuboid with this section, in world coordinates
+                    ly0, ly1 = max(y0, sy * SECTION), min(y1, sy * SECTION + 15)
+                    lx0, lx1 = max(x0, sx * SECTION), min(x1, sx * SECTION + 15)
+                    lz0, lz1 = max(z0, sz * SECTION), min(z1, sz * SECTION + 15)
+                    out[ly0 - y0:ly1 - y0 + 1, lx0 - x0:lx1 - x0 + 1, lz0 - z0:lz1 - z0 + 1] = section.to_array()[
+                        ly0 & 15:(ly1 & 15) + 1, lx0 & 15:(lx1 & 15) + 1, lz0 & 15:(lz1 & 15) + 1
+                    ]
+        return out
+
+    def chunk_memory(self, cx, cz):
+        return sum(section.memory_bytes() for section in self.chunks.get((cx, cz), {}).values())
+
+    def memory_report(self):
+        """{(cx, cz): packed bytes} per stored chunk."""
+        return {key: self.chunk_memory(*key) for key in self.chunks}
+
+    def memory_bytes(self):
+        return sum(section.memory_bytes() for _, section in self.sections())
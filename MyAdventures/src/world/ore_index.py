@@ -0,0 +1,116 @@
+from bisect import bisect_left, bisect_right, insort
+import mcpi.block as block
+
+"""
+    Where the valuable blocks are. One list of (x, y, z) per block type,
+    kept sorted by x: box and radius queries bisect the x range and filter
+    the rest, nearest-neighbour walks outwards from the query's x until the
+    x distance alone exceeds the best match. Points are added and removed
+    one at a time as chunks are surveyed and blocks are mined.
+"""
+
+ORES = {
+    "coal": block.COAL_ORE.id,
+    "iron": block.IRON_ORE.id,
+    "gold": block.GOLD_ORE.id,
+    "diamond": block.DIAMOND_ORE.id,
+    "redstone": block.REDSTONE_ORE.id,
+    "lapis": block.LAPIS_LAZULI_ORE.id,
+}
+
+
+def _distance(a, b):
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+class OreIndex:
+
+    def __init__(self, block_ids=ORES.values()):
+        self.points = {block_id: [] for block_id in block_ids}
+
+    def __contains__(self, block_id):
+        return block_id in self.points
+
+    def count(self, block_id):
+        return len(self.points.get(block_id, ()))
+
+    def add(self, block_id, position):
+        points = self.points.get(block_id)
+        if points is None:
+            return
+        i = bisect_left(points, position)
+        if i == len(points) or points[i] != position:
+            points.insert(i, position)
+
+    def discard(self, block_id, position):
+        points = self.points.get(block_id)
+        if not points:
+            return
+        i = bisect_left(points, position)
+        if i < len(points) and points[i] == position:
+            del points[i]
+
+    def discard_box(self, x0, y0, z0, x1, y1, z1, block_ids=None):
+        """Forget every indexed point inside the box, e.g. before re-reading it."""
+        for block_id in block_ids or self.points:
+            for position in self.in_box(block_id, x0, y0, z0, x1, y1, z1):
+                self.discard(block_id, position)
+
+    def extend(self, block_id, positions):
+        points = self.points.get(block_id)
+        if points is None:
+            return
+        positions = sorted(positions)
+        if len(positions) * 16 < len(points):
+            for position in positions:
+                insort(points, position)
+        else:
+            # Two sorted runs: list.sort merges them in a single pass
+            points.extend(positions)
+            points.sort()
+
+    def in_box(self, block_id, x0, y0, z0, x1, y1, z1):
+        """Positions of `block_id` with x0 <= x <= x1 and so on, in x order."""
+        points = self.points.get(block_id, [])
+        start = bisect_left(points, (x0,))
+        stop = bisect_right(points, (x1, float("inf")))
+        return [p for p in points[start:stop] if y0 <= p[1] <= y1 and z0 <= p[2] <= z1]
+
+    def in_radius(self, block_id, center, radius):
+        """Positions of `block_id` within `radius` of center, nearest first."""
+        x, y, z = center
+        limit = radius * radius
+        found = [
+            p for p in self.in_box(block_id, x - radius, y - radius, z - radius, x + radius, y + radius, z + radius)
+            if _distance(p, center) <= limit
+        ]
+        return sorted(found, key=lambda p: _distance(p, center))
+
+    def nearest(self, block_id, center, max_distance=None):
+        """Closest position of `block_id` to center, or None."""
+        points = self.points.get(block_id, [])
+        best, best_distance = None, float("inf") if max_distance is None else max_distance ** 2 + 1
+        i = bisect_left(points, (center[0],))
+        left, right = i - 1, i
+
+        while left >= 0 or right < len(points):
+            # Step to whichever side is closer along x
+            if right >= len(points) or (left >= 0 and center[0] - points[left][0] <= points[right][0] - center[0]):
+                point, left = points[left], left - 1
+            else:
+                point, right = points[right], right + 1
+            if (point[0] - center[0]) ** 2 >= best_distance:
+                break
+            d = _distance(point, center)
+            if d < best_distance:
+                best, best_distance = point, d
+        return best
+
+    def nearest_any(self, center, block_ids=None, max_distance=None):
+        """(block id, position) of the closest of several block types, or None."""
+        found = [
+            (_distance(position, center), block_id, position)
+            for block_id in block_ids or self.points
+            if (position := self.nearest(block_id, center, max_distance)) is not None
+        ]
+        return min(found)[1:] if found else None
@@ -0,0 +1,416 @@
+import asyncio
+import itertools
+import math
+import time
+from array import array
+from collections import OrderedDict
+from heapq import heappop, heappush
+import numpy as np
+import mcpi.block as block
+from src.world.chunk_store import MISSING, SECTION
+from src.world.world_model import LIQUIDS, WorldModel
+
+"""
+    Walking routes over the cached world, no live getBlock probing.
+
+    A cell (x, y, z) is standable when the feet and head blocks are passable
+    and the block below is solid. Standability is precomputed per chunk
+    column as a NumPy bitmap and rebuilt only when that chunk changes.
+
+    The search is A* over 8-connected horizontal moves, one-block step ups
+    and drops of up to three blocks. The bitmaps are bit-packed and cover
+    only the levels something can stand on.
+
+    On level ground the search is jump point search (the variant that never
+    cuts corners): a node only pushes the jump points ahead of it, cells
+    where a wall ends and opens a side route, instead of every cell of a
+    straight run. Cells with a way up or down (an "exit" bitmap, built
+    across chunk borders) are always jump points and are expanded with
+    every move, so changes of level are searched exactly like plain A*.
+"""
+
+PASSABLE = frozenset(b.id for b in (
+    block.AIR, block.SAPLING, block.GRASS_TALL, block.FLOWER_YELLOW, block.FLOWER_CYAN,
+    block.MUSHROOM_BROWN, block.MUSHROOM_RED, block.TORCH, block.SNOW, block.SUGAR_CANE,
+))
+MAX_DROP = 3
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+SQRT2 = math.sqrt(2)
+
+
+def _octile(a, b):
+    dx, dz = abs(a[0] - b[0]), abs(a[2] - b[2])
+    return max(dx, dz) + (SQRT2 - 1) * min(dx, dz)
+
+
+def _heuristic(a, b):
+    return _octile(a, b) + abs(a[1] - b[1])
+
+
+def _sign(value):
+    return (value > 0) - (value < 0)
+
+
+class Walkability:
+    """Standable/passable/exit bitmaps per surveyed chunk column."""
+
+    def __init__(self, world):
+        self.world = world
+        # (cx, cz) -> (revisions, lowest y, rows, standable, passable, exit,
+        # standable by z, exit by z), or None for chunks never surveyed. The
+        # first bitmaps hold (y, x) rows of z bits, the last two (y, z) rows
+        # of x bits so runs along x are one row too. Exits depend on the
+        # border blocks of the four neighbouring chunks, so `revisions`
+        # covers them
+        self._chunks = {}
+        self._revision = None
+
+    def _revisions(self, cx, cz):
+        revisions = self.world.chunk_revisions
+        return tuple(revisions.get((cx + dx, cz + dz)) for dx, dz in ((0, 0), (1, 0), (-1, 0), (0, 1), (0, -1)))
+
+    def sync(self):
+        """Drop bitmaps of chunks that changed, or whose neighbours did, since the last call."""
+        if self._revision == self.world.revision:
+            return
+        revisions = self.world.chunk_revisions
+        self._chunks = {
+            key: entry for key, entry in self._chunks.items()
+            if (entry[0] == self._revisions(*key) if entry is not None else key not in revisions)
+        }
+        self._revision = self.world.revision
+
+    def _build(self, cx, cz):
+        if (cx, cz) not in self.world.chunk_revisions:
+            self._chunks[(cx, cz)] = None
+            return None
+        levels = sorted(self.world.store.chunks[(cx, cz)])
+        y0, y1 = levels[0] * SECTION, levels[-1] * SECTION + SECTION - 1
+        x0, z0 = cx * SECTION, cz * SECTION
+        read = self.world.store.read_cuboid
+        # The chunk plus a one-block border of its four neighbours; the
+        # corners stay MISSING, only orthogonal neighbours matter
+        blocks = np.full((y1 - y0 + 1, SECTION + 2, SECTION + 2), MISSING, dtype=np.uint16)
+        blocks[:, 1:-1, 1:-1] = read(x0, y0, z0, x0 + 15, y1, z0 + 15)
+        blocks[:, 0, 1:-1] = read(x0 - 1, y0, z0, x0 - 1, y1, z0 + 15)[:, 0]
+        blocks[:, -1, 1:-1] = read(x0 + 16, y0, z0, x0 + 16, y1, z0 + 15)[:, 0]
+        blocks[:, 1:-1, 0] = read(x0, y0, z0 - 1, x0 + 15, y1, z0 - 1)[:, :, 0]
+        blocks[:, 1:-1, -1] = read(x0, y0, z0 + 16, x0 + 15, y1, z0 + 16)[:, :, 0]
+
+        passable = np.isin(blocks, list(PASSABLE))
+        solid = ~passable & (blocks != MISSING) & ~np.isin(blocks, list(LIQUIDS))
+        standable = np.zeros_like(passable)
+        standable[1:-1] = passable[1:-1] & passable[2:] & solid[:-2]
+        # A neighbour that is not standable but can be stepped up onto or
+        # dropped into; erring towards "yes" only adds jump points
+        above = np.zeros_like(standable)
+        above[:-1] = standable[1:]
+        open_above = np.zeros_like(passable)
+        open_above[:-1] = passable[:-1] & passable[1:]
+        other_level = ~standable & (above | open_above)
+        exit = standable[:, 1:-1, 1:-1] & (
+            other_level[:, 2:, 1:-1] | other_level[:, :-2, 1:-1] | other_level[:, 1:-1, 2:] | other_level[:, 1:-1, :-2]
+        )
+        standable, passable = standable[:, 1:-1, 1:-1], passable[:, 1:-1, 1:-1]
+
+        # Only the levels anything can stand on, plus the two above them for
+        # head room checks; every lookup outside reads as False
+        levels = np.flatnonzero(standable.any(axis=(1, 2)))
+        low, high = (int(levels[0]), min(int(levels[-1]) + 3, len(standable))) if levels.size else (0, 0)
+        # One 16-bit word per row, bit i for the i-th block along the row
+        entry = self._chunks[(cx, cz)] = (self._revisions(cx, cz), y0 + low, high - low) + tuple(
+            array("H", np.packbits(bitmap[low:high], axis=2, bitorder="little").view("<u2").ravel().tolist())
+            for bitmap in (standable, passable, exit, standable.transpose(0, 2, 1), exit.transpose(0, 2, 1))
+        )
+        return entry
+
+    def level(self, key, y):
+        """(entry, index of its first row) for level y of chunk `key`, or None if nothing is there."""
+        entry = self._chunks[key] if key in self._chunks else self._build(*key)
+        if entry is None or not 0 <= y - entry[1] < entry[2]:
+            return None
+        return entry, (y - entry[1]) * SECTION
+
+    def _lookup(self, x, y, z, which):
+        found = self.level((x >> 4, z >> 4), y)
+        if found is None:
+            return False
+        entry, base = found
+        return entry[which][base + (x & 15)] >> (z & 15) & 1
+
+    def memory_bytes(self):
+        return sum(len(entry[3]) * entry[3].itemsize * 5 for entry in self._chunks.values() if entry is not None)
+
+    def standable(self, x, y, z):
+        return self._lookup(x, y, z, 3)
+
+    def passable(self, x, y, z):
+        return self._lookup(x, y, z, 4)
+
+    def exit(self, x, y, z):
+        """Standable with a neighbour on another level to step up onto or drop into."""
+        return self._lookup(x, y, z, 5)
+
+
+class PathFinder:
+
+    def __init__(self, world=None, cache_size=256, max_expansions=100_000, slice_expansions=16, jump_points=True):
+        self.world = world or WorldModel()
+        self.walkability = Walkability(self.world)
+        self.cache_size = cache_size
+        self.max_expansions = max_expansions
+        self.slice_expansions = slice_expansions
+        self.jump_points = jump_points
+        # Nodes expanded by the last search that was not a cache hit
+        self.expansions = 0
+        self._cache = OrderedDict()
+        self._cache_revision = None
+
+    def find_path(self, start, goal):
+        """List of standable cells from start to goal, or None if no route is known."""
+        search = self.search(start, goal)
+        while True:
+            try:
+                next(search)
+            except StopIteration as done:
+                return done.value
+
+    async def find_path_async(self, start, goal, slice_seconds=0.005):
+        """find_path, yielding to the event loop whenever a slice of `slice_seconds` is used up."""
+        search = self.search(start, goal)
+        deadline = time.perf_counter() + slice_seconds
+        while True:
+            try:
+                next(search)
+            except StopIteration as done:
+                return done.value
+            if time.perf_counter() > deadline:
+                await asyncio.sleep(0)
+                deadline = time.perf_counter() + slice_seconds
+
+    def search(self, start, goal):
+        """Generator running the search; yields every `slice_expansions` nodes, returns the path."""
+        start, goal = tuple(start), tuple(goal)
+        if self._cache_revision != self.world.revision:
+            self._cache.clear()
+            self._cache_revision = self.world.revision
+            self.walkability.sync()
+        key = (start, goal)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        path = yield from self._astar(start, goal)
+        self._cache[key] = path
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return path
+
+    def _astar(self, start, goal):
+        if not (self.walkability.standable(*start) and self.walkability.standable(*goal)):
+            return None
+
+        counter = itertools.count()
+        g = {start: 0.0}
+        parents = {start: None}
+        heap = [(_heuristic(start, goal), 0.0, next(counter), start)]
+        closed = set()
+
+        while heap:
+            _, _, _, node = heappop(heap)
+            if node in closed:
+                continue
+            if node == goal:
+                self.expansions = len(closed)
+                return self._expand(parents, goal)
+            closed.add(node)
+            self.expansions = len(closed)
+            if len(closed) > self.max_expansions:
+                return None
+            if len(closed) % self.slice_expansions == 0:
+                yield
+
+            for successor, cost in self._successors(node, parents[node], goal):
+                if successor in closed:
+                    continue
+                score = g[node] + cost
+                if score < g.get(successor, math.inf):
+                    g[successor] = score
+                    parents[successor] = node
+                    h = _heuristic(successor, goal)
+                    # Ties go to the node closest to the goal
+                    heappush(heap, (score + h, h, next(counter), successor))
+        return None
+
+    def _successors(self, node, parent, goal):
+        x, y, z = node
+        if not self.jump_points or parent is None or parent[1] != y or self.walkability.exit(x, y, z):
+            yield from self._moves(node)
+            return
+
+        # Level ground: prune to the directions a path through this node
+        # from its parent can need, and jump along each of them
+        for direction in self._pruned(node, _sign(x - parent[0]), _sign(z - parent[2])):
+            point = self._jump(node, direction, goal)
+            if point is not None:
+                yield point, _octile(node, point)
+
+    def _pruned(self, node, dx, dz):
+        standable = self.walkability.standable
+        x, y, z = node
+        if dx and dz:
+            ahead_x, ahead_z = standable(x + dx, y, z), standable(x, y, z + dz)
+            directions = [(dx, 0)] * ahead_x + [(0, dz)] * ahead_z
+            if ahead_x and ahead_z:
+                directions.append((dx, dz))
+            return directions
+
+        # Moving straight without cutting corners, the sides stay open too:
+        # straight jumps stop where a wall beside them ends
+        px, pz = dz, dx
+        ahead = standable(x + dx, y, z + dz)
+        directions = [(dx, dz)] if ahead else []
+        for side in (1, -1):
+            if standable(x + px * side, y, z + pz * side):
+                directions.append((px * side, pz * side))
+                if ahead:
+                    directions.append((dx + px * side, dz + pz * side))
+        return directions
+
+    def _jump(self, node, direction, goal):
+        """The next jump point from `node` going `direction`, or None if the run dead-ends."""
+        dx, dz = direction
+        if not (dx and dz):
+            return self._jump_straight(node, dx, dz, goal)
+
+        standable, exit = self.walkability.standable, self.walkability.exit
+        x, y, z = node
+        while True:
+            x, z = x + dx, z + dz
+            if not standable(x, y, z):
+                return None
+            point = (x, y, z)
+            if point == goal or exit(x, y, z):
+                return point
+            if self._jump_straight(point, dx, 0, goal) is not None or self._jump_straight(point, 0, dz, goal) is not None:
+                return point
+            # No corner cutting: both sides must be open to go on
+            if not (standable(x + dx, y, z) and standable(x, y, z + dz)):
+                return None
+
+    def _jump_straight(self, node, dx, dz, goal):
+        """
+            _jump along x or z, a chunk row at a time: the first cell that is
+            the goal, an exit, or where a wall beside the run ends (a forced
+            neighbour) is found with bit operations on 16-bit rows.
+        """
+        level = self.walkability.level
+        x, y, z = node
+        # Runs along x read the by-z bitmaps, where a row holds 16 x bits
+        if dx:
+            along, other, step, standable, exit = x, z, dx, 6, 7
+        else:
+            along, other, step, standable, exit = z, x, dz, 3, 5
+        goal_along, goal_other = (goal[0], goal[2]) if dx else (goal[2], goal[0])
+        index, sides = other & 15, (other + 1, other - 1)
+
+        chunk = along >> 4
+        # Cells past `along` in the direction of travel
+        mask = (0xFFFF << (along & 15) + 1) & 0xFFFF if step > 0 else (1 << (along & 15)) - 1
+        # Side bits of the last cell of the previous chunk, for the forced check
+        carries = [0, 0]
+        while True:
+            found = level((chunk, other >> 4) if dx else (other >> 4, chunk), y)
+            if found is None:
+                return None
+            entry, base = found
+            cells = entry[standable][base + index]
+            forced = 0
+            for i, side in enumerate(sides):
+                if side >> 4 == other >> 4:
+                    bits = entry[standable][base + (side & 15)]
+                else:
+                    beside = level((chunk, side >> 4) if dx else (side >> 4, chunk), y)
+                    bits = beside[0][standable][beside[1] + (side & 15)] if beside is not None else 0
+                # Open beside this cell, blocked beside the one before it
+                if step > 0:
+                    forced |= bits & ~(bits << 1 & 0xFFFF | carries[i])
+                    carries[i] = bits >> 15
+                else:
+                    forced |= bits & ~(bits >> 1 | carries[i] << 15)
+                    carries[i] = bits & 1
+            stops = (forced | entry[exit][base + index]) & cells & mask
+            if goal[1] == y and goal_other == other and goal_along >> 4 == chunk:
+                stops |= 1 << (goal_along & 15) & mask
+            blocked = ~cells & mask
+
+            if stops or blocked:
+                if step > 0:
+                    first_stop = (stops & -stops).bit_length() - 1
+                    first_block = (blocked & -blocked).bit_length() - 1
+                    hit = stops and (not blocked or first_stop < first_block)
+                else:
+                    first_stop, first_block = stops.bit_length() - 1, blocked.bit_length() - 1
+                    hit = stops and first_stop > first_block
+                if not hit:
+                    return None
+                along = chunk * SECTION + first_stop
+                return (along, y, other) if dx else (other, y, along)
+            chunk += step
+            mask = 0xFFFF
+
+    def _moves(self, node):
+        standable, passable = self.walkability.standable, self.walkability.passable
+        x, y, z = node
+        for dx, dz in DIRECTIONS:
+            nx, nz = x + dx, z + dz
+            if dx and dz:
+                # Diagonals stay level and never cut a corner
+                if (
+                    standable(nx, y, nz)
+                    and passable(nx, y, z) and passable(nx, y + 1, z)
+                    and passable(x, y, nz) and passable(x, y + 1, nz)
+                ):
+                    yield (nx, y, nz), SQRT2
+                continue
+
+            if standable(nx, y, nz):
+                yield (nx, y, nz), 1.0
+            elif standable(nx, y + 1, nz) and passable(x, y + 2, z):
+                yield (nx, y + 1, nz), 2.0
+            elif passable(nx, y, nz) and passable(nx, y + 1, nz):
+                for ny in range(y - 1, y - MAX_DROP - 1, -1):
+                    if standable(nx, ny, nz):
+                        yield (nx, ny, nz), 1.0 + (y - ny)
+                        break
+                    if not passable(nx, ny, nz):
+                        break
+
+    @staticmethod
+    def _expand(parents, goal):
+        """Parent chain -> every cell along the way, filling in jumped-over runs."""
+        points = []
+        node = goal
+        while node is not None:
+            points.append(node)
+            node = parents[node]
+        points.reverse()
+
+        path = [points[0]]
+        for a, b in zip(points, points[1:]):
+            if a[1] == b[1]:
+                dx, dz = _sign(b[0] - a[0]), _sign(b[2] - a[2])
+                x, z = a[0], a[2]
+                while (x, z) != (b[0], b[2]):
+                    x, z = x + dx, z + dz
+                    path.append((x, a[1], z))
+            else:
+                path.append(b)
+        return path
+
+
+async def walk(path, move, step_delay=0.05):
+    """Move along `path` one cell at a time with the async `move(x, y, z)`."""
+    for x, y, z in path[1:]:
+        await move(x, y, z)
+        await asyncio.sleep(step_delay)
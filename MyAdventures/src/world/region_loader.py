@@ -0,0 +1,164 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+import numpy as np
+from src.utils.logging import Logger
+from src.utils.world_snapshot import attach
+from src.world.anvil import COLUMN_HEIGHT, RegionFile, decode_column, iter_columns, region_paths
+from src.world.chunk_store import AIR, SECTION, Section
+from src.world.ore_index import ORES
+
+"""
+    Region import spread over a process pool. Chunks are handed out in
+    batches; a worker decompresses and decodes its batch and also does the
+    expensive part of ingesting it: it builds the palette-packed Sections,
+    the column heights and the ore positions. Section palettes and data go
+    back through a slot of one shared-memory segment, the rest (counts,
+    heights, ores) is small and returned with the future. The parent only
+    installs the finished sections into the WorldModel while the workers
+    fill the other slots. That install (the heights dict and the ore index)
+    stays serial, about a quarter of the single-process import's time, so
+    it bounds what extra cores can gain.
+"""
+
+_COLUMN_BYTES = COLUMN_HEIGHT * SECTION * SECTION * 2
+_ORE_IDS = np.array(sorted(ORES.values()), dtype=np.uint16)
+
+# Per worker process: open region files and the attached segment
+_regions = {}
+_segments = {}
+
+
+def pack_column(cx, cz, column):
+    """(cx, cz, sections, tops, ores) of a decoded column, as WorldModel.ingest_packed takes them."""
+    sections = {sy: Section(column[sy * SECTION:(sy + 1) * SECTION]) for sy in range(len(column) // SECTION)}
+    solid = column != AIR
+    ys = np.where(solid.any(axis=0), len(column) - 1 - np.argmax(solid[::-1], axis=0), -1)
+    ids = np.take_along_axis(column, np.maximum(ys, 0)[None], axis=0)[0]
+
+    ores = {}
+    ly, lx, lz = np.nonzero(np.isin(column, _ORE_IDS))
+    if ly.size:
+        found = column[ly, lx, lz].tolist()
+        for block_id, position in zip(found, zip((lx + cx * SECTION).tolist(), ly.tolist(), (lz + cz * SECTION).tolist())):
+            ores.setdefault(block_id, []).append(position)
+    return cx, cz, sections, np.stack((ys, ids.astype(ys.dtype))), ores
+
+
+def _pack_batch(segment_name, slot, offset, size, path, coords):
+    segment = _segments.get(segment_name)
+    if segment is None:
+        segment = _segments[segment_name] = attach(segment_name)
+    region = _regions.get(path)
+    if region is None:
+        region = _regions[path] = RegionFile(path)
+
+    buffer = segment.buf
+    position, end = offset, offset + size
+    columns = []
+    for cx, cz in coords:
+        cx, cz, sections, tops, ores = pack_column(cx, cz, decode_column(region.level(cx, cz)))
+        parts = {}
+        for sy, section in sections.items():
+            palette, data = section.palette.tobytes(), section.data.tobytes()
+            length = len(palette) + len(data)
+            if position + length <= end:
+                buffer[position:position + length] = palette + data
+                parts[sy] = (section.bits, section.counts, position, len(palette), len(data))
+                position += length
+            else:
+                # Slot full (only with huge palettes): send this one inline
+                parts[sy] = (section.bits, section.counts, palette, data)
+        columns.append((cx, cz, parts, tops, ores))
+    return slot, columns
+
+
+def _unpack(buffer, parts):
+    sections = {}
+    for sy, (bits, counts, *where) in parts.items():
+        if len(where) == 2:
+            palette, data = where
+        else:
+            start, palette_length, data_length = where
+            palette = buffer[start:start + palette_length]
+            data = buffer[start + palette_length:start + palette_length + data_length]
+        sections[sy] = Section.from_packed(palette, bits, data, counts)
+    return sections
+
+
+def import_regions(world, region_dir, workers=None, batch=32):
+    """
+        Load every chunk under `region_dir` into `world` (a WorldModel)
+        using `workers` processes (all cores by default); returns the chunk
+        count. Runs in this process when only one worker would: a single
+        batch of chunks, or a single core.
+    """
+    started = time.perf_counter()
+    tasks = deque()
+    for path in region_paths(region_dir):
+        with RegionFile(path) as region:
+            coords = list(region.chunks())
+        tasks.extend((path, coords[i:i + batch]) for i in range(0, len(coords), batch))
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    count = 0
+    installing = 0.0
+    if workers <= 1:
+        pending = []
+        for cx, cz, column in iter_columns(region_dir):
+            pending.append(pack_column(cx, cz, column))
+            if len(pending) == batch:
+                installing -= time.perf_counter()
+                world.ingest_packed(pending, imported=True)
+                installing += time.perf_counter()
+                count += len(pending)
+                pending = []
+        installing -= time.perf_counter()
+        world.ingest_packed(pending, imported=True)
+        installing += time.perf_counter()
+        count += len(pending)
+        _report(count, region_dir, 1, started, installing)
+        return count
+
+    # Two slots per worker keeps every worker busy while the parent installs
+    slots = min(2 * workers, len(tasks))
+    slot_bytes = batch * _COLUMN_BYTES
+    segment = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+    free = deque(range(slots))
+    try:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            running = set()
+            while tasks or running:
+                while free and tasks:
+                    slot = free.popleft()
+                    path, coords = tasks.popleft()
+                    running.add(pool.submit(_pack_batch, segment.name, slot, slot * slot_bytes, slot_bytes, path, coords))
+
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    slot, columns = future.result()
+                    install_started = time.perf_counter()
+                    world.ingest_packed(
+                        [(cx, cz, _unpack(segment.buf, parts), tops, ores) for cx, cz, parts, tops, ores in columns],
+                        imported=True
+                    )
+                    installing += time.perf_counter() - install_started
+                    count += len(columns)
+                    free.append(slot)
+    finally:
+        segment.close()
+        segment.unlink()
+
+    _report(count, region_dir, workers, started, installing)
+    return count
+
+
+def _report(count, region_dir, workers, started, installing):
+    elapsed = time.perf_counter() - started
+    Logger().log_info(
+        "WorldImport", "import", "%d chunks from %s on %d processes in %.2fs (%.0f chunks/s, %.2fs installing)",
+        count, region_dir, workers, elapsed, count / elapsed if elapsed else 0.0, installing
+    )
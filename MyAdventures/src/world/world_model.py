@@ -0,0 +1,361 @@
+from bisect import bisect_left
+from collections import defaultdict
+from heapq import heapify, heappop, heappush
+import numpy as np
+from src.utils.singleton import Singleton
+from src.world.chunk_store import AIR, SECTION, ChunkStore, section_key
+from src.world.ore_index import OreIndex
+
+"""
+    What the agents know about the world: the surveyed blocks, the surface
+    height of every surveyed column and indexes answering "where is the
+    nearest X" and "where is there a flat N x N area" without rescanning.
+"""
+
+# Surfaces nothing should be built on
+LIQUIDS = frozenset((8, 9, 10, 11))
+
+
+def _box_distance(key, x, y, z):
+    """Squared distance from (x, y, z) to the closest point of section `key`."""
+    total = 0
+    for coord, s in zip((x, y, z), key):
+        low = s * SECTION
+        high = low + SECTION - 1
+        if coord < low:
+            total += (low - coord) ** 2
+        elif coord > high:
+            total += (coord - high) ** 2
+    return total
+
+
+def _ring(cx, cz, ring):
+    """The chunks at Chebyshev distance `ring` from (cx, cz)."""
+    if ring == 0:
+        yield cx, cz
+        return
+    for dx in range(-ring, ring + 1):
+        yield cx + dx, cz - ring
+        yield cx + dx, cz + ring
+    for dz in range(-ring + 1, ring):
+        yield cx - ring, cz + dz
+        yield cx + ring, cz + dz
+
+
+class WorldModel(metaclass=Singleton):
+
+    def __init__(self):
+        self.store = ChunkStore()
+        # (x, z) -> (y, block id) of the highest non-air block surveyed
+        self.heights = {}
+        self.sections_by_block = defaultdict(set)
+        self.chunks = set()
+        # Chunks loaded from region files and not surveyed live since; the
+        # files may be stale, so they do not count as surveyed
+        self.imported = set()
+        self.ores = OreIndex()
+        # Bumped on every change, globally and per (cx, cz), for derived caches
+        self.revision = 0
+        self.chunk_revisions = {}
+        # Called with (corners, block id) for every change agents make
+        self.listeners = []
+        # Called with (cuboids, imported) for every ingested batch, the
+        # cuboids as (x0, y0, z0, x1, y1, z1, (y, x, z) block array)
+        self.ingest_listeners = []
+        # (x, z) columns agents have built on; flat areas must avoid them,
+        # surveyed or not, or the next build lands on this one's roof
+        self.built = set()
+        self._flat = None
+        # (cx, cz) of a flat area's far corner -> (largest size, its areas)
+        self._flat_grid = None
+
+    def ingest(self, x0, y0, z0, x1, y1, z1, ids):
+        """Add a world.getBlocks result covering whole sections."""
+        self.ingest_many([(x0, y0, z0, x1, y1, z1, ids)])
+
+    def ingest_many(self, cuboids, imported=False, notify=True):
+        """
+            ingest() for a batch of (x0, y0, z0, x1, y1, z1, ids), indexing
+            their ores in one pass. `imported` marks blocks read from region
+            files rather than from the running server; `notify=False` keeps
+            the batch from ingest_listeners (it came from another copy of
+            the world).
+        """
+        keys = set()
+        ingested = []
+        for x0, y0, z0, x1, y1, z1, ids in cuboids:
+            x0, x1 = sorted((x0, x1))
+            y0, y1 = sorted((y0, y1))
+            z0, z1 = sorted((z0, z1))
+            blocks = np.asarray(ids if isinstance(ids, np.ndarray) else list(ids), dtype=np.uint16)
+            # Only chunks known before can hold stale ore positions
+            if any((cx, cz) in self.chunks for cx in range(x0 >> 4, (x1 >> 4) + 1) for cz in range(z0 >> 4, (z1 >> 4) + 1)):
+                self.ores.discard_box(x0, y0, z0, x1, y1, z1)
+            for key in self.store.load_cuboid(x0, y0, z0, x1, y1, z1, blocks):
+                self._index_section(key)
+                keys.add(key)
+                self.chunks.add((key[0], key[2]))
+                if imported:
+                    self.imported.add((key[0], key[2]))
+                else:
+                    self.imported.discard((key[0], key[2]))
+                self._touch(key[0], key[2])
+
+            blocks = blocks.reshape(y1 - y0 + 1, x1 - x0 + 1, z1 - z0 + 1)
+            ingested.append((x0, y0, z0, x1, y1, z1, blocks))
+            solid = blocks != AIR
+            # Highest non-air layer of every column, scanning from the top
+            tops = blocks.shape[0] - 1 - np.argmax(solid[::-1], axis=0)
+            filled = solid.any(axis=0)
+            for ix, iz in np.ndindex(filled.shape):
+                x, z = x0 + ix, z0 + iz
+                known = self.heights.get((x, z))
+                # A cuboid says nothing about columns whose top lies above it
+                if known is not None and known[0] > y1:
+                    continue
+                if filled[ix, iz]:
+                    self._set_height(x, z, (y0 + int(tops[ix, iz]), int(blocks[tops[ix, iz], ix, iz])))
+                elif known is not None and known[0] >= y0:
+                    self._set_height(x, z, self._scan_down(x, y0 - 1, z))
+        self._index_ores(keys)
+        if notify and ingested:
+            for listener in self.ingest_listeners:
+                listener(ingested, imported)
+
+    def ingest_packed(self, columns, imported=False):
+        """
+            ingest_many() for whole chunk columns, from y 0 up, whose
+            sections were already built elsewhere (region import workers).
+            Each column is (cx, cz, {section y: Section}, tops, ores): tops a
+            (2, 16, 16) array of the highest non-air block's y (-1 for an
+            empty column) and id, ores {block id: [(x, y, z), ...]}. Not
+            passed to ingest_listeners.
+        """
+        found = defaultdict(list)
+        for cx, cz, sections, tops, ores in columns:
+            x0, z0 = cx * SECTION, cz * SECTION
+            y1 = (max(sections) + 1) * SECTION - 1
+            known = (cx, cz) in self.chunks
+            if known:
+                self.ores.discard_box(x0, 0, z0, x0 + SECTION - 1, y1, z0 + SECTION - 1)
+            for sy, section in sections.items():
+                self.store.put_section((cx, sy, cz), section)
+                if known:
+                    self._index_section((cx, sy, cz))
+                else:
+                    for block_id in section.counts:
+                        self.sections_by_block[block_id].add((cx, sy, cz))
+            self.chunks.add((cx, cz))
+            if imported:
+                self.imported.add((cx, cz))
+            else:
+                self.imported.discard((cx, cz))
+            self._touch(cx, cz)
+            for block_id, positions in ores.items():
+                found[block_id].extend(positions)
+
+            ys, ids = tops.tolist()
+            if not known:
+                # Nothing was known here, so every filled column is new
+                self.heights.update(
+                    ((x0 + ix, z0 + iz), (y, ids[ix][iz]))
+                    for ix, row in enumerate(ys) for iz, y in enumerate(row) if y >= 0
+                )
+                self._flat = None
+                continue
+            for ix, row in enumerate(ys):
+                for iz, y in enumerate(row):
+                    top = self.heights.get((x0 + ix, z0 + iz))
+                    if top is not None and top[0] > y1:
+                        continue
+                    self._set_height(x0 + ix, z0 + iz, (y, ids[ix][iz]) if y >= 0 else None)
+        for block_id, positions in found.items():
+            self.ores.extend(block_id, positions)
+
+    def set_block(self, x, y, z, block_id):
+        """Record a block change made by an agent."""
+        self._set_block(x, y, z, block_id)
+        self._mark_built(x, z, x, z, block_id)
+        self._notify((x, y, z, x, y, z), block_id)
+
+    def _set_block(self, x, y, z, block_id):
+        self.ores.discard(self.store.get_block(x, y, z), (x, y, z))
+        self.ores.add(block_id, (x, y, z))
+        self.store.set_block(x, y, z, block_id)
+        self._index_section(section_key(x, y, z))
+        self._touch(x >> 4, z >> 4)
+
+        top = self.heights.get((x, z))
+        if block_id != AIR and (top is None or y >= top[0]):
+            self._set_height(x, z, (y, block_id))
+        elif block_id == AIR and top is not None and y == top[0]:
+            self._set_height(x, z, self._scan_down(x, y - 1, z))
+
+    def fill(self, x0, y0, z0, x1, y1, z1, block_id):
+        """Record a setBlocks cuboid; parts of it that were never surveyed stay unknown."""
+        for y in range(min(y0, y1), max(y0, y1) + 1):
+            for x in range(min(x0, x1), max(x0, x1) + 1):
+                for z in range(min(z0, z1), max(z0, z1) + 1):
+                    if self.store.get_block(x, y, z) is not None:
+                        self._set_block(x, y, z, block_id)
+        self._mark_built(x0, z0, x1, z1, block_id)
+        self._notify((x0, y0, z0, x1, y1, z1), block_id)
+
+    def _mark_built(self, x0, z0, x1, z1, block_id):
+        if block_id == AIR:
+            return
+        self.built.update(
+            (x, z) for x in range(min(x0, x1), max(x0, x1) + 1) for z in range(min(z0, z1), max(z0, z1) + 1)
+        )
+        self._flat = None
+
+    def _notify(self, corners, block_id):
+        for listener in self.listeners:
+            listener(corners, block_id)
+
+    def get_block(self, x, y, z):
+        return self.store.get_block(x, y, z)
+
+    def _touch(self, cx, cz):
+        self.revision += 1
+        self.chunk_revisions[(cx, cz)] = self.revision
+
+    def is_surveyed(self, cx, cz):
+        """Whether chunk (cx, cz) was read from the running server."""
+        return (cx, cz) in self.chunks and (cx, cz) not in self.imported
+
+    def _scan_down(self, x, y, z):
+        while True:
+            block_id = self.store.get_block(x, y, z)
+            if block_id is None:
+                return None
+            if block_id != AIR:
+                return y, block_id
+            y -= 1
+
+    def _set_height(self, x, z, top):
+        if top is None:
+            self.heights.pop((x, z), None)
+        else:
+            self.heights[(x, z)] = top
+        self._flat = None
+
+    def _index_section(self, key):
+        counts = self.store.section(key).counts
+        for block_id, sections in list(self.sections_by_block.items()):
+            if block_id not in counts:
+                sections.discard(key)
+        for block_id in counts:
+            self.sections_by_block[block_id].add(key)
+
+    def _index_ores(self, keys):
+        found = defaultdict(list)
+        for key in keys:
+            section = self.store.section(key)
+            for block_id in section.counts:
+                if block_id in self.ores:
+                    ly, rest = np.divmod(section.positions(block_id), SECTION * SECTION)
+                    lx, lz = np.divmod(rest, SECTION)
+                    coords = np.stack((lx, ly, lz), axis=1) + np.array(key) * SECTION
+                    found[block_id].extend(map(tuple, coords.tolist()))
+        for block_id, positions in found.items():
+            self.ores.extend(block_id, positions)
+
+    def nearest_block(self, block_id, x, y, z):
+        """
+            Closest surveyed (x, y, z) holding `block_id`, or None. Sections
+            containing the block are visited best-first by their distance
+            bound, so only the few nearest ones are ever decoded.
+        """
+        heap = [(_box_distance(key, x, y, z), 0, key) for key in self.sections_by_block.get(block_id, ())]
+        heapify(heap)
+        while heap:
+            distance, exact, item = heappop(heap)
+            if exact:
+                return item
+            positions = self.store.section(item).positions(block_id)
+            if positions.size:
+                ly, rest = np.divmod(positions, SECTION * SECTION)
+                lx, lz = np.divmod(rest, SECTION)
+                coords = np.stack((lx, ly, lz), axis=1) + np.array(item) * SECTION
+                distances = ((coords - (x, y, z)) ** 2).sum(axis=1)
+                best = int(np.argmin(distances))
+                heappush(heap, (int(distances[best]), 1, tuple(map(int, coords[best]))))
+        return None
+
+    def _index_flat_areas(self):
+        # Largest square of equal, buildable surface ending at each column
+        squares = {}
+        for x, z in sorted(self.heights):
+            y, block_id = self.heights[(x, z)]
+            size = 0
+            if block_id not in LIQUIDS and (x, z) not in self.built:
+                size = 1
+                neighbours = [squares.get(n) for n in ((x - 1, z), (x, z - 1), (x - 1, z - 1))]
+                if all(n is not None and n[1] == y for n in neighbours):
+                    size += min(n[0] for n in neighbours)
+            squares[(x, z)] = (size, y)
+        self._flat = sorted((size, x, z, y) for (x, z), (size, y) in squares.items() if size)
+        self._flat_grid = {}
+        for area in self._flat:
+            key = (area[1] >> 4, area[2] >> 4)
+            largest, areas = self._flat_grid.get(key, (0, []))
+            areas.append(area)
+            self._flat_grid[key] = (max(largest, area[0]), areas)
+
+    def flat_area(self, size, near=None):
+        """
+            (x, y, z) corner of a flat size x size area, y being the first free
+            layer above the surface, or None. With `near` = (x, z) the closest
+            candidate is returned.
+        """
+        if self._flat is None:
+            self._index_flat_areas()
+        if near is not None:
+            best = self._nearest_flat(size, *near)
+        else:
+            i = bisect_left(self._flat, (size,))
+            best = self._flat[i] if i < len(self._flat) else None
+        if best is None:
+            return None
+        _, x, z, y = best
+        return x - size + 1, y + 1, z - size + 1
+
+    def _nearest_flat(self, size, x, z):
+        """
+            Area of at least `size` whose far corner is closest to (x, z),
+            visiting the chunk buckets in rings around (x, z) until no
+            farther ring can hold a closer one.
+        """
+        if not self._flat_grid:
+            return None
+        cx, cz = int(x // SECTION), int(z // SECTION)
+        reach = max(
+            max(abs(kx - cx), abs(kz - cz)) for kx, kz in self._flat_grid
+        )
+        best = None
+        for ring in range(reach + 1):
+            if best is not None and ((ring - 1) * SECTION) ** 2 > best[0]:
+                break
+            for key in _ring(cx, cz, ring):
+                bucket = self._flat_grid.get(key)
+                if bucket is None or bucket[0] < size:
+                    continue
+                for area in bucket[1]:
+                    if area[0] >= size:
+                        candidate = ((area[1] - x) ** 2 + (area[2] - z) ** 2, area)
+                        if best is None or candidate < best:
+                            best = candidate
+        return best[1] if best else None
+
+    def largest_flat_area(self):
+        if self._flat is None:
+            self._index_flat_areas()
+        return self._flat[-1][0] if self._flat else 0
+
+    def block_counts(self):
+        counts = defaultdict(int)
+        for _, section in self.store.sections():
+            for block_id, count in section.counts.items():
+                counts[block_id] += count
+        return dict(counts)
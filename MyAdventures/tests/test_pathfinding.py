@@ -0,0 +1,91 @@
+import math
+import numpy as np
+import pytest
+from src.world.pathfinding import PathFinder
+from src.world.world_model import WorldModel
+
+SIZE = 64
+
+
+def make_world(blocks):
+    # WorldModel is a singleton; tests want one world each
+    world = WorldModel.__new__(WorldModel)
+    world.__init__()
+    world.ingest_many([
+        (cx * 16, 0, cz * 16, cx * 16 + 15, len(blocks) - 1, cz * 16 + 15, blocks[:, cx * 16:cx * 16 + 16, cz * 16:cz * 16 + 16])
+        for cx in range(SIZE // 16) for cz in range(SIZE // 16)
+    ])
+    return world
+
+
+def open_ground():
+    blocks = np.zeros((32, SIZE, SIZE), np.uint16)
+    blocks[:10] = 1
+    return blocks
+
+
+def walls():
+    blocks = open_ground()
+    for i, z in enumerate(range(12, SIZE - 8, 12)):
+        gap = slice(0, 6) if i % 2 else slice(SIZE - 6, SIZE)
+        blocks[10:12, :, z] = 1
+        blocks[10:12, gap, z] = 0
+    return blocks
+
+
+def terraces():
+    # Blocks of ground at different heights, with scattered pillars
+    rng = np.random.default_rng(7)
+    heights = (9 + rng.integers(0, 3, (SIZE // 8, SIZE // 8))).repeat(8, 0).repeat(8, 1)
+    pillars = rng.random((SIZE, SIZE)) < 0.15
+    blocks = np.zeros((32, SIZE, SIZE), np.uint16)
+    for y in range(32):
+        blocks[y][(heights > y) | (pillars & (y - heights < 2))] = 1
+    return blocks, heights
+
+
+def cost(path):
+    total = 0.0
+    for a, b in zip(path, path[1:]):
+        if a[1] == b[1]:
+            total += math.hypot(b[0] - a[0], b[2] - a[2])
+        else:
+            total += 2.0 if b[1] > a[1] else 1.0 + a[1] - b[1]
+    return total
+
+
+def assert_walkable(path):
+    for a, b in zip(path, path[1:]):
+        assert max(abs(b[0] - a[0]), abs(b[2] - a[2])) == 1
+
+
+@pytest.mark.parametrize("blocks", [open_ground(), walls()], ids=["open ground", "walls"])
+def test_jump_points_expand_fewer_nodes(blocks):
+    world = make_world(blocks)
+    start, goal = (2, 10, 2), (SIZE - 3, 10, SIZE - 3)
+    astar, jps = PathFinder(world, jump_points=False), PathFinder(world)
+
+    plain = astar.find_path(start, goal)
+    jumped = jps.find_path(start, goal)
+
+    assert jps.expansions < astar.expansions / 10
+    assert jumped[0] == start and jumped[-1] == goal
+    assert_walkable(jumped)
+    assert cost(jumped) == pytest.approx(cost(plain))
+
+
+def test_jump_points_keep_paths_optimal_across_levels():
+    blocks, heights = terraces()
+    world = make_world(blocks)
+    astar, jps = PathFinder(world, jump_points=False), PathFinder(world)
+    rng = np.random.default_rng(3)
+
+    for _ in range(50):
+        start, goal = (tuple(int(v) for v in rng.integers(0, SIZE, 2)) for _ in range(2))
+        start = (start[0], int(heights[start]), start[1])
+        goal = (goal[0], int(heights[goal]), goal[1])
+        plain, jumped = astar.find_path(start, goal), jps.find_path(start, goal)
+        assert (plain is None) == (jumped is None)
+        if jumped is not None:
+            assert_walkable(jumped)
+            assert cost(jumped) == pytest.approx(cost(plain))
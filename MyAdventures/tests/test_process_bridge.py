@@ -0,0 +1,75 @@
+import asyncio
+import numpy as np
+import pytest
+from src.agents.base_agent import BaseAgent
+from src.command_related.agent_names import AgentNames
+from src.communication.process_bridge import WorkerProcess
+from src.reflection.states import State
+from src.utils.metrics import Metrics
+from src.utils.singleton import Singleton
+from src.world.world_model import WorldModel
+
+STONE = 1
+
+
+class SurveyingAgent(BaseAgent):
+    """Surveys one chunk and digs a block out of it, in whatever process hosts it."""
+    agent_name = AgentNames.EXPLORER
+
+    def __init__(self):
+        super().__init__()
+        self.state = State.RUNNING
+
+    async def _perceive(self):
+        return None
+
+    async def _decide(self, perception):
+        return None
+
+    async def _act(self, decision):
+        world = WorldModel()
+        world.ingest(0, 0, 0, 15, 15, 15, np.full(16 ** 3, STONE, dtype=np.uint16))
+        world.fill(3, 15, 4, 3, 15, 4, 0)
+        self.state = State.IDLE
+
+
+async def run_until(worker, done):
+    running = asyncio.create_task(worker.run())
+    try:
+        async with asyncio.timeout(30):
+            while not done():
+                await asyncio.sleep(0.05)
+    finally:
+        running.cancel()
+        await asyncio.gather(running, return_exceptions=True)
+
+
+@pytest.fixture
+def world():
+    Singleton._instances.pop(WorldModel, None)
+    yield WorldModel()
+    Singleton._instances.pop(WorldModel, None)
+
+
+def test_worker_world_changes_reach_the_parent(world):
+    worker = WorkerProcess([SurveyingAgent], outbox=lambda msg: None)
+    asyncio.run(run_until(worker, lambda: world.get_block(3, 15, 4) == 0))
+
+    assert (0, 0) in world.chunks
+    assert world.is_surveyed(0, 0)
+    assert world.get_block(0, 0, 0) == STONE
+    assert world.get_block(3, 15, 4) == 0
+    assert world.heights[(3, 4)] == (14, STONE)
+
+
+def test_worker_metrics_reach_the_parent_exporter(world):
+    Singleton._instances.pop(Metrics, None)
+    metrics = Metrics()
+    cycles = 'agent_cycles_total{agent="explorer",process="explorer"}'
+    worker = WorkerProcess([SurveyingAgent], outbox=lambda msg: None, metrics=True)
+    try:
+        asyncio.run(run_until(worker, lambda: cycles in metrics.render_prometheus()))
+        assert 'agent_act_seconds_count{agent="explorer",process="explorer"}' in metrics.render_prometheus()
+        assert metrics.snapshot()["counters"]['agent_cycles{agent="explorer",process="explorer"}'] >= 1
+    finally:
+        Singleton._instances.pop(Metrics, None)
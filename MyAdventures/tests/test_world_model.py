@@ -0,0 +1,64 @@
+import numpy as np
+from src.world.world_model import WorldModel
+
+SIZE = 96
+
+
+def make_world(blocks):
+    world = WorldModel.__new__(WorldModel)
+    world.__init__()
+    world.ingest_many([
+        (cx * 16, 0, cz * 16, cx * 16 + 15, len(blocks) - 1, cz * 16 + 15, blocks[:, cx * 16:cx * 16 + 16, cz * 16:cz * 16 + 16])
+        for cx in range(SIZE // 16) for cz in range(SIZE // 16)
+    ])
+    return world
+
+
+def bumpy_ground(seed):
+    rng = np.random.default_rng(seed)
+    heights = (5 + rng.integers(0, 3, (SIZE // 4, SIZE // 4))).repeat(4, 0).repeat(4, 1)
+    blocks = np.zeros((16, SIZE, SIZE), np.uint16)
+    for y in range(16):
+        blocks[y][heights > y] = 1
+    return blocks
+
+
+def scan_nearest(world, size, near):
+    # The linear scan flat_area(near=...) used to do
+    candidates = [c for c in world._flat if c[0] >= size]
+    if not candidates:
+        return None
+    _, x, z, y = min(candidates, key=lambda c: (c[1] - near[0]) ** 2 + (c[2] - near[1]) ** 2)
+    return x - size + 1, y + 1, z - size + 1
+
+
+def test_nearest_flat_area_matches_a_full_scan():
+    rng = np.random.default_rng(3)
+    for seed in range(3):
+        world = make_world(bumpy_ground(seed))
+        world.largest_flat_area()
+        for _ in range(40):
+            size = int(rng.integers(1, 9))
+            near = tuple(rng.uniform(-40, SIZE + 40, 2))
+            assert world.flat_area(size, near=near) == scan_nearest(world, size, near)
+
+
+def test_flat_areas_skip_what_was_built():
+    blocks = np.zeros((16, SIZE, SIZE), np.uint16)
+    blocks[:5] = 1
+    world = make_world(blocks)
+    x, y, z = world.flat_area(7, near=(40, 40))
+    # A flat-roofed house on the site: its roof is just as flat
+    world.fill(x, y, z, x + 6, y + 4, z + 6, 5)
+    x2, _, z2 = world.flat_area(7, near=(40, 40))
+    assert x2 > x + 6 or x2 + 6 < x or z2 > z + 6 or z2 + 6 < z
+
+
+def test_builds_outside_the_survey_still_count():
+    blocks = np.zeros((16, SIZE, SIZE), np.uint16)
+    blocks[:5] = 1
+    world = make_world(blocks)
+    # Above the surveyed layers, so the heights never see it
+    world.fill(0, 20, 0, 4, 24, 4, 5)
+    x, _, z = world.flat_area(5, near=(0, 0))
+    assert x > 4 or z > 4